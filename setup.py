@@ -41,5 +41,13 @@ setup(
     install_requires=[
         'jsonschema == 2.4.0',
         'incf.countryutils == 1.0'
-    ]
+    ],
+    extras_require={
+        'numpy': ['numpy'],
+    },
+    entry_points={
+        'console_scripts': [
+            'typeschema-index-cities = typeschema.types.gazetteer:main',
+        ],
+    }
 )
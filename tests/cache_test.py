@@ -0,0 +1,11 @@
+import doctest
+import unittest
+
+import typeschema._cache
+
+
+class TestCase(unittest.TestCase):
+    def test_cache_doc(self):
+        fails, tested = doctest.testmod(typeschema._cache)
+        if fails > 0:
+            self.fail('Doctest failed!')
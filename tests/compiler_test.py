@@ -0,0 +1,116 @@
+import doctest
+import unittest
+
+import typeschema
+import typeschema._compiler
+
+
+SCHEMAS_AND_VALUES = [
+    ({'type': 'integer'}, [1, 1L, 1.0, True, None, '1']),
+    ({'type': 'number', 'minimum': 1, 'exclusiveMinimum': True},
+     [0, 1, 1.5, True, 'a']),
+    ({'type': 'number', 'maximum': 1}, [0, 1, 2, False]),
+    ({'minimum': 2}, [float('nan'), float('inf'), float('-inf')]),
+    ({'minimum': 2, 'exclusiveMinimum': True},
+     [float('nan'), float('inf'), float('-inf')]),
+    ({'maximum': 2}, [float('nan'), float('inf'), float('-inf')]),
+    ({'maximum': 2, 'exclusiveMaximum': True},
+     [float('nan'), float('inf'), float('-inf')]),
+    ({'multipleOf': 0.1}, [0.3, 0.35, 'a']),
+    ({'multipleOf': 3}, [9, 10, 'a']),
+    ({'type': 'string', 'minLength': 2, 'maxLength': 3, 'pattern': '^a'},
+     ['a', 'ab', 'abcd', 'ba', u'abc', 1]),
+    ({'enum': [1, 'a', None]}, [1, 1.0, True, 'a', u'a', None, 2, [1]]),
+    ({'enum': [[1], {'a': 1}]}, [[1], {'a': 1}, 1]),
+    ({'anyOf': [{'type': 'integer'}, {'type': 'null'}]}, [1, None, 'a']),
+    ({'allOf': [{'type': 'integer'}, {'minimum': 3}]}, [1, 3, 'a']),
+    ({'oneOf': [{'type': 'integer'}, {'type': 'number'}]}, [1, 1.5, 'a']),
+    ({'not': {'type': 'string'}}, ['a', 1]),
+    ({'type': 'array', 'items': {'type': 'integer'}, 'minItems': 1,
+      'maxItems': 3, 'uniqueItems': True},
+     [[], [1], [1, 1], [1, 2, 3, 4], [1, 'a'], 'a']),
+    ({'items': [{'type': 'integer'}, {'type': 'string'}],
+      'additionalItems': False},
+     [[], [1], [1, 'a'], ['a'], [1, 'a', 2]]),
+    ({'items': [{'type': 'integer'}], 'additionalItems': {'type': 'string'}},
+     [[1, 'a', 'b'], [1, 'a', 2]]),
+    ({'type': 'object',
+      'properties': {'a': {'type': 'integer'}},
+      'patternProperties': {'^x': {'type': 'string'}},
+      'additionalProperties': False,
+      'required': ['a'],
+      'minProperties': 1,
+      'maxProperties': 2},
+     [{}, {'a': 1}, {'a': 'a'}, {'a': 1, 'xb': 'b'}, {'a': 1, 'xb': 1},
+      {'a': 1, 'b': 1}, {'a': 1, 'xb': 'b', 'xc': 'c'}]),
+    ({'additionalProperties': {'type': 'integer'}},
+     [{'a': 1}, {'a': 'a'}]),
+    ({'dependencies': {'a': ['b'], 'c': {'required': ['d']}}},
+     [{}, {'a': 1}, {'a': 1, 'b': 1}, {'c': 1}, {'c': 1, 'd': 1}]),
+    ({'type': 'even'}, [2, 3, 'a']),
+    ({'type': 'small'}, [2, 30, 'a']),
+    ({'type': 'date_time'}, [1, None]),
+    ({'type': ['even', 'null']}, [2, 3, None]),
+    ({'type': 'integer', 'description': 'ignored'}, [1, 'a']),
+]
+
+
+class TestCase(unittest.TestCase):
+    def test_compiler_doc(self):
+        fails, tested = doctest.testmod(typeschema._compiler)
+        if fails > 0:
+            self.fail('Doctest failed!')
+
+    def _checker(self):
+        import datetime
+        checker = typeschema.Checker()
+        checker.define('even', lambda x: x % 2 == 0)
+        checker.define('small', {'type': 'integer', 'maximum': 10})
+        checker.define('date_time', datetime.datetime)
+        return checker
+
+    def test_generated_code_agrees_with_jsonschema(self):
+        checker = self._checker()
+        for schema, values in SCHEMAS_AND_VALUES:
+            compiled = checker.compile(schema)
+            validator = checker._validator(schema)
+            for value in values:
+                self.assertEqual(
+                    compiled.is_valid(value), validator.is_valid(value),
+                    '%r against %r' % (value, schema))
+            self.assertIsNotNone(compiled.source, schema)
+
+    def test_unsupported_schema_falls_back(self):
+        checker = self._checker()
+        compiled = checker.compile({
+            'definitions': {'int': {'type': 'integer'}},
+            'properties': {'a': {'$ref': '#/definitions/int'}},
+        })
+        self.assertTrue(compiled.is_valid({'a': 1}))
+        self.assertFalse(compiled.is_valid({'a': 'a'}))
+        self.assertIsNone(compiled.source)
+
+    def test_unknown_type_raises(self):
+        checker = self._checker()
+        self.assertRaises(typeschema.UnknownType,
+                          checker.check, 1, {'type': 'foo'})
+
+    def test_recursive_type(self):
+        checker = typeschema.Checker()
+        checker.define('tree', {
+            'type': 'object',
+            'properties': {
+                'children': {'type': 'array', 'items': {'type': 'tree'}},
+            },
+        })
+        checker.check({'children': [{'children': []}]}, {'type': 'tree'})
+        self.assertRaises(typeschema.ValidationError, checker.check,
+                          {'children': [{'children': 1}]}, {'type': 'tree'})
+
+    def test_compiled_schema_follows_definitions(self):
+        checker = typeschema.Checker()
+        checker.define('small', {'type': 'integer', 'maximum': 10})
+        compiled = checker.compile({'type': 'small'})
+        compiled(5)
+        checker.define('small', {'type': 'integer', 'maximum': 1})
+        self.assertRaises(typeschema.ValidationError, compiled, 5)
@@ -1,7 +1,11 @@
 import doctest
+import itertools
+import random
 import unittest
 
+import typeschema
 import typeschema.decorators
+from typeschema.decorators import ArgValidationError, check_args
 
 
 class TestCase(unittest.TestCase):
@@ -9,3 +13,159 @@ class TestCase(unittest.TestCase):
         fails, tested = doctest.testmod(typeschema.decorators)
         if fails > 0:
             self.fail('Doctest failed!')
+
+    def test_keywords(self):
+        @check_args({'a': {'type': 'integer'}, 'kw': {'type': 'string'}})
+        def f(a, b=None, **kw):
+            return a, b, kw
+
+        self.assertEqual(f(1, b=2, c='c'), (1, 2, {'c': 'c'}))
+        self.assertEqual(f(a=1), (1, None, {}))
+        self.assertRaises(ArgValidationError, f, a='1')
+        try:
+            f(1, c=3)
+            self.fail('ArgValidationError not raised')
+        except ArgValidationError as e:
+            self.assertIn("argument 'c'", str(e))
+
+    def test_inexistent_argument(self):
+        self.assertRaises(Exception, check_args({'b': {}}), lambda a: a)
+
+    def test_invalid_default(self):
+        def f(a=1):
+            pass
+        self.assertRaises(ArgValidationError,
+                          check_args({'a': {'type': 'string'}}), f)
+
+    def test_keeps_metadata(self):
+        @check_args({'a': {'type': 'integer'}})
+        def f(a):
+            """Docstring."""
+
+        self.assertEqual(f.__name__, 'f')
+        self.assertEqual(f.__doc__, 'Docstring.')
+
+    def test_no_schemas_returns_function(self):
+        def f(a):
+            pass
+        self.assertIs(check_args({})(f), f)
+
+    def test_checker_and_custom_check_function(self):
+        checker = typeschema.Checker()
+        checker.define('even', lambda x: x % 2 == 0)
+        calls = []
+
+        def check(value, schema):
+            calls.append((value, schema))
+
+        @check_args({'a': {'type': 'even'}}, check_function=checker.check)
+        @check_args({'a': {'type': 'foo'}}, check_function=check)
+        def f(a):
+            return a
+
+        self.assertEqual(f(2), 2)
+        self.assertEqual(calls, [(2, {'type': 'foo'})])
+        self.assertRaises(ArgValidationError, f, 3)
+
+    def test_disabled_returns_function(self):
+        def f(a):
+            pass
+        decorated = check_args({'a': {'type': 'integer'}},
+                               policy=typeschema.decorators.DISABLED)(f)
+        self.assertIs(decorated, f)
+
+    def test_policy_changes_at_runtime(self):
+        @check_args({'a': {'type': 'integer'}})
+        def f(a):
+            return a
+
+        self.assertRaises(ArgValidationError, f, '1')
+        f.policy = typeschema.decorators.DISABLED
+        self.assertEqual(f('1'), '1')
+        f.policy = None
+        typeschema.decorators.set_policy(typeschema.decorators.DISABLED)
+        try:
+            self.assertEqual(f('1'), '1')
+            f.policy = typeschema.decorators.ALWAYS
+            self.assertRaises(ArgValidationError, f, '1')
+        finally:
+            typeschema.decorators.set_policy(typeschema.decorators.ALWAYS)
+
+    def test_sampled(self):
+        checked = []
+
+        def check(value, schema):
+            checked.append(value)
+
+        @check_args({'a': {}}, check_function=check,
+                    policy=typeschema.decorators.Sampled(0.25))
+        def f(a):
+            pass
+
+        random_state = random.getstate()
+        random.seed(1)
+        try:
+            for i in range(4000):
+                f(i)
+        finally:
+            random.setstate(random_state)
+        self.assertTrue(800 < len(checked) < 1200, len(checked))
+
+    def test_first_calls(self):
+        @check_args({'a': {'type': 'integer'}},
+                    policy=typeschema.decorators.FirstCalls(2))
+        def f(a):
+            return a
+
+        self.assertEqual(f(1), 1)
+        self.assertRaises(ArgValidationError, f, '1')
+        self.assertEqual(f('1'), '1')
+
+    def test_check_returns_policy(self):
+        @typeschema.decorators.check_returns(
+            {'type': 'integer'}, policy=typeschema.decorators.FirstCalls(1))
+        def f(a):
+            return a
+
+        self.assertRaises(typeschema.decorators.ReturnValidationError,
+                          f, '1')
+        self.assertEqual(f('1'), '1')
+
+    def test_check_yields_is_lazy(self):
+        produced = []
+
+        @typeschema.decorators.check_yields({'type': 'integer'})
+        def numbers(n):
+            for i in range(n):
+                produced.append(i)
+                yield i
+            yield 'end'
+
+        items = numbers(3)
+        self.assertEqual(produced, [])
+        self.assertEqual(next(items), 0)
+        self.assertEqual(produced, [0])
+        self.assertEqual(list(itertools.islice(items, 2)), [1, 2])
+        try:
+            next(items)
+            self.fail('YieldValidationError not raised')
+        except typeschema.decorators.YieldValidationError as e:
+            self.assertEqual(e.index, 3)
+            self.assertEqual(e.cause.instance, 'end')
+
+    def test_check_yields_disabled(self):
+        @typeschema.decorators.check_yields({'type': 'integer'})
+        def numbers():
+            return iter(['a'])
+
+        numbers.policy = typeschema.decorators.DISABLED
+        self.assertEqual(list(numbers()), ['a'])
+
+    def test_stacked_with_check_args(self):
+        @check_args({'a': {'type': 'integer'}})
+        @typeschema.decorators.check_returns({'type': 'string'})
+        def f(a):
+            return str(a)
+
+        self.assertEqual(f(1), '1')
+        self.assertRaises(ArgValidationError, f, '1')
@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+import unittest
+
+_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Optional dependencies that must only be imported when they are used.
+_lazy = ['numpy', 'incf']
+
+
+def _imported_after(module):
+    # A new interpreter, so that nothing has been imported yet.
+    output = subprocess.check_output([
+        sys.executable, '-c',
+        'import sys, %s; print " ".join(m for m in %r if m in sys.modules)'
+        % (module, _lazy),
+    ], cwd=_root)
+    return output.split()
+
+
+class TestCase(unittest.TestCase):
+    def test_optional_dependencies_are_lazy(self):
+        for module in [
+            'typeschema',
+            'typeschema.properties',
+            'typeschema.properties.location',
+            'typeschema.properties.network',
+            'typeschema.properties.time',
+            'typeschema.types.location',
+            'typeschema.types.network',
+            'typeschema.types.time',
+        ]:
+            self.assertEqual(_imported_after(module), [], module)
+
+    def test_numpy_is_imported_on_first_use(self):
+        try:
+            import numpy
+        except ImportError:
+            self.skipTest('NumPy is not installed')
+        import typeschema.types.time
+        mask, converted = typeschema.types.time.to_datetimes([0])
+        self.assertIsInstance(mask, numpy.ndarray)
@@ -0,0 +1,68 @@
+import doctest
+import pickle
+import unittest
+
+import typeschema
+import typeschema.parallel
+import typeschema.types.time
+
+
+class TestCase(unittest.TestCase):
+    def test_parallel_doc(self):
+        fails, tested = doctest.testmod(typeschema.parallel)
+        if fails > 0:
+            self.fail('Doctest failed!')
+
+    def test_pickle_checker(self):
+        checker = typeschema.Checker()
+        checker.extend(typeschema.types.time.types,
+                       typeschema.types.time.coercions)
+        checker.define('small', {'type': 'integer', 'maximum': 10})
+        for checker in [checker, checker.frozen()]:
+            copy = pickle.loads(pickle.dumps(checker))
+            self.assertIs(type(copy), type(checker))
+            copy.check('2012-04-23', {'type': 'date'})
+            self.assertEqual(
+                copy.coerce('2012-04-23', 'date').isoformat(), '2012-04-23')
+            copy.check(5, {'type': 'small'})
+            self.assertFalse(copy.is_valid(50, {'type': 'small'}))
+
+    def test_pickle_compiled_schema(self):
+        compiled = typeschema.checker.compile({'type': 'integer'})
+        copy = pickle.loads(pickle.dumps(compiled, 2))
+        copy(1)
+        self.assertRaises(typeschema.ValidationError, copy, 'a')
+
+    def test_keeps_order(self):
+        values = range(100)
+        values[37] = 'a'
+        values[81] = None
+        schema = {'type': 'integer'}
+
+        indices = typeschema.parallel.check_parallel(
+            values, schema, workers=3, chunksize=7,
+            mode=typeschema.INVALID_INDICES)
+        self.assertEqual(indices, [37, 81])
+
+        errors = typeschema.parallel.check_parallel(
+            iter(values), schema, workers=3, chunksize=7)
+        self.assertEqual(len(errors), 100)
+        self.assertEqual([i for i, e in enumerate(errors) if e], [37, 81])
+        self.assertEqual(errors[37].instance, 'a')
+        self.assertEqual(errors[37].validator, 'type')
+
+        try:
+            typeschema.parallel.check_parallel(
+                values, schema, workers=3, chunksize=7,
+                mode=typeschema.FAIL_FAST)
+            self.fail('ValidationError not raised')
+        except typeschema.ValidationError as e:
+            self.assertEqual(list(e.path), [37])
+
+    def test_pickle_memoized_checker(self):
+        checker = typeschema.Checker()
+        checker.define('date', typeschema.types.time.is_date, memoize=True)
+        checker.check('2012-04-23', {'type': 'date'})
+        copy = pickle.loads(pickle.dumps(checker))
+        copy.check('2012-04-23', {'type': 'date'})
+        self.assertEqual(copy.memo_info('date').misses, 1)
@@ -1,6 +1,8 @@
 import doctest
 import unittest
 
+import typeschema
+import typeschema.properties
 import typeschema.properties.network
 
 
@@ -9,3 +11,53 @@ class TestCase(unittest.TestCase):
         fails, tested = doctest.testmod(typeschema.properties.network)
         if fails > 0:
             self.fail('Doctest failed!')
+
+    def test_packed_ip(self):
+        network = typeschema.properties.network
+
+        class Host(typeschema.properties.Model):
+            any = network.packed_ip('any', default='::1')
+            v4 = network.packed_ip('v4', version=4)
+            v6 = network.packed_ip('v6', version=6)
+
+        host = Host(any='10.0.0.1', v6='2001:db8::1')
+        self.assertEqual(host.any, '10.0.0.1')
+        self.assertEqual(host._ts_any, '\n\0\0\1')
+        self.assertIsNone(host.v4)
+        self.assertEqual(host.v6, '2001:db8::1')
+        self.assertEqual(Host().any, '::1')
+
+        host.v4 = '127.0.0.1'
+        self.assertEqual(host._ts_v4, 0x7f000001)
+        self.assertEqual(host.v4, '127.0.0.1')
+        host.v4 = None
+        self.assertIsNone(host.v4)
+
+        with self.assertRaises(typeschema.ValidationError) as cm:
+            host.update(v6='10.0.0.1')
+        self.assertEqual(list(cm.exception.path), ['v6'])
+        self.assertEqual(host.v6, '2001:db8::1')
+        self.assertRaises(typeschema.ValidationError,
+                          setattr, host, 'any', '1')
+        self.assertRaises(ValueError, network.packed_ip, 'ip', version=5)
+
+    def test_packed_ip_deferred(self):
+        network = typeschema.properties.network
+
+        class Host(typeschema.properties.Model):
+            deferred_validation = True
+            any = network.packed_ip('any')
+            v4 = network.packed_ip('v4', version=4)
+
+        host = Host()
+        host.any = '10.0.0.1'
+        host.v4 = '10.0.0.2'
+        self.assertEqual((host.any, host.v4), ('10.0.0.1', '10.0.0.2'))
+        host.validate()
+        self.assertEqual((host._ts_any, host._ts_v4), ('\n\0\0\1', 0x0a000002))
+        self.assertEqual((host.any, host.v4), ('10.0.0.1', '10.0.0.2'))
+
+        host.v4 = 'Foo'
+        self.assertEqual(host.v4, 'Foo')
+        self.assertRaises(typeschema.ValidationError, host.validate)
+
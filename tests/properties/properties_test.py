@@ -1,8 +1,13 @@
+import copy
+import datetime
 import doctest
+import pickle
 import unittest
 
 import typeschema
 import typeschema.properties as ty
+import typeschema.properties.network
+import typeschema.properties.time
 
 
 class TestCase(unittest.TestCase):
@@ -23,3 +28,304 @@ class TestCase(unittest.TestCase):
         a.my_attr.append(4)
         self.assertEqual(a.my_attr, [1, 2, 3, 4])
         self.assertEqual(b.my_attr, [1, 2, 3])
+
+    def test_immutable_default_is_shared(self):
+        default = (1, ('a', 2.0))
+
+        class MyClass(object):
+            my_attr = ty.property('my_attr', {}, default=default)
+
+        self.assertIs(MyClass().my_attr, default)
+
+    def test_default_factory(self):
+        class MyClass(object):
+            my_attr = ty.list('my_attr', default_factory=lambda: [1])
+
+        a = MyClass()
+        a.my_attr.append(2)
+        self.assertEqual(a.my_attr, [1, 2])
+        self.assertEqual(MyClass().my_attr, [1])
+        self.assertRaises(ValueError, ty.list, 'x', [], lambda: [])
+        self.assertRaises(
+            typeschema.ValidationError, ty.list, 'x', default_factory=dict)
+
+    def test_float_none(self):
+        class MyClass(object):
+            my_attr = ty.float('my_attr', default=1)
+
+        a = MyClass()
+        self.assertEqual(type(a.my_attr), float)
+        a.my_attr = None
+        self.assertEqual(a.my_attr, None)
+
+
+class Point(ty.Model):
+    x = ty.int('x', default=0)
+    tags = ty.list('tags', default=[])
+
+
+class Point3D(Point):
+    z = ty.float('z')
+
+
+class Shape(ty.Model):
+    tags = ty.list('tags', default_factory=list)
+    labels = ty.dict('labels', default_factory=dict)
+
+
+class ModelTestCase(unittest.TestCase):
+    def test_no_dict(self):
+        point = Point()
+        self.assertFalse(hasattr(point, '__dict__'))
+        self.assertEqual(
+            sorted(Point3D._properties), ['tags', 'x', 'z'])
+
+    def test_mutable_default(self):
+        a = Point()
+        b = Point()
+        a.tags.append(1)
+        self.assertEqual(a.tags, [1])
+        self.assertEqual(b.tags, [])
+
+    def test_default_copied_on_first_read(self):
+        point = Point()
+        self.assertIs(point._ts_tags, ty._unset)
+        self.assertEqual(point.tags, [])
+        self.assertIs(point.tags, point._ts_tags)
+        for protocol in [0, 2]:
+            self.assertEqual(
+                pickle.loads(pickle.dumps(Point(), protocol)).tags, [])
+
+    def test_pickle_unread_default_factory(self):
+        for protocol in [0, 2]:
+            shape = pickle.loads(pickle.dumps(Shape(), protocol))
+            self.assertEqual(shape.tags, [])
+            self.assertEqual(shape.labels, {})
+
+    def test_inherited_properties(self):
+        point = Point3D(x=1, z=2)
+        self.assertEqual((point.x, point.tags, point.z), (1, [], 2.0))
+        self.assertRaises(typeschema.ValidationError, setattr, point, 'x', 'a')
+        self.assertRaises(typeschema.ValidationError, setattr, point, 'z', 'a')
+
+    def test_pickle(self):
+        point = pickle.loads(pickle.dumps(Point3D(x=1, z=2), 2))
+        self.assertEqual((point.x, point.tags, point.z), (1, [], 2.0))
+
+    def test_pickle_default_protocol(self):
+        point = pickle.loads(pickle.dumps(Point3D(x=1, z=2)))
+        self.assertEqual((point.x, point.tags, point.z), (1, [], 2.0))
+        point.update(x=2)
+        self.assertEqual(point.x, 2)
+
+    def test_property_named_dirty(self):
+        class Flagged(ty.Model):
+            dirty = ty.bool('dirty', default=False)
+            x = ty.int('x')
+
+        class TrustedFlagged(Flagged):
+            deferred_validation = True
+
+        flagged = Flagged(dirty=True)
+        flagged.update(x=2)
+        self.assertEqual((flagged.dirty, flagged.x), (True, 2))
+
+        trusted = TrustedFlagged()
+        trusted.dirty = True
+        trusted.x = '3'
+        self.assertRaises(typeschema.ValidationError, trusted.validate)
+        trusted.x = 3
+        trusted.validate()
+        self.assertEqual((trusted.dirty, trusted.x), (True, 3))
+
+    def test_extra_slots(self):
+        class Named(ty.Model):
+            __slots__ = ('label',)
+            x = ty.int('x')
+
+        named = Named(x=1)
+        named.label = 'a'
+        self.assertEqual((named.x, named.label), (1, 'a'))
+
+    def test_update_is_atomic(self):
+        point = Point3D(x=1)
+        self.assertRaises(
+            typeschema.ValidationError, point.update, x=2, tags=None, z='a')
+        self.assertRaises(AttributeError, point.update, x=2, w=1)
+        self.assertEqual((point.x, point.tags, point.z), (1, [], None))
+
+    def test_from_dict_converts(self):
+        point = Point3D.from_dict({u'x': 1, u'z': 2})
+        self.assertEqual((point.x, point.tags, point.z), (1, [], 2.0))
+        self.assertEqual(type(point.z), float)
+
+    def test_update_with_several_checkers(self):
+        class Event(ty.Model):
+            id = ty.int('id')
+            host = typeschema.properties.network.ip('host')
+            date = typeschema.properties.time.date('date')
+
+        # Time properties check and convert values by themselves.
+        self.assertEqual(len(Event._validators), 2)
+        event = Event.from_dict({'id': 1, 'date': '2013-01-13'})
+        self.assertEqual(event.date, datetime.date(2013, 1, 13))
+        for fields, path in [
+            ({'date': '2013-13-13'}, ['date']),
+            ({'host': 'a'}, ['host']),
+        ]:
+            with self.assertRaises(typeschema.ValidationError) as cm:
+                event.update(id=2, **fields)
+            self.assertEqual(list(cm.exception.path), path)
+        self.assertEqual(event.id, 1)
+
+
+class TrustedPoint(Point3D):
+    deferred_validation = True
+
+
+class DeferredModelTestCase(unittest.TestCase):
+    def test_inherited_properties_are_deferred(self):
+        point = TrustedPoint()
+        point.x = 'a'
+        point.z = 1
+        self.assertEqual(point._typeschema_dirty, set(['x', 'z']))
+        self.assertRaises(typeschema.ValidationError, point.validate)
+        self.assertEqual((point.x, point.z), ('a', 1))
+
+        point.x = 2
+        point.validate()
+        self.assertEqual((point.x, point.z), (2, 1.0))
+        self.assertIs(point._typeschema_dirty, None)
+
+        # The base class still checks eagerly.
+        self.assertRaises(
+            typeschema.ValidationError, setattr, Point3D(), 'x', 'a')
+
+    def test_update_clears_dirty(self):
+        point = TrustedPoint()
+        point.x = 'a'
+        point.update(x=1)
+        point.validate()
+        self.assertEqual(point.x, 1)
+
+    def test_pickle_validates(self):
+        point = TrustedPoint()
+        point.z = 'a'
+        self.assertRaises(
+            typeschema.ValidationError, pickle.dumps, point, 2)
+        point.z = 3
+        self.assertEqual(pickle.loads(pickle.dumps(point, 2)).z, 3.0)
+
+    def test_pickle_default_protocol(self):
+        point = TrustedPoint()
+        point.z = 3
+        point = pickle.loads(pickle.dumps(point))
+        self.assertEqual(point.z, 3.0)
+        point.x = 'a'
+        self.assertRaises(typeschema.ValidationError, point.validate)
+
+
+class Counter(object):
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, value):
+        self.calls += 1
+        typeschema.check(value, {'type': 'integer'})
+
+
+class ContainerTestCase(unittest.TestCase):
+    def test_list_checks_only_changes(self):
+        counter = Counter()
+        numbers = ty.ValidatedList(counter, range(1000))
+        self.assertEqual(counter.calls, 1000)
+
+        counter.calls = 0
+        numbers.append(1)
+        numbers.insert(0, 2)
+        numbers += [3, 4]
+        numbers[5] = 5
+        numbers[10:12] = [6]
+        self.assertEqual(counter.calls, 6)
+        self.assertEqual(len(numbers), 1003)
+
+        for change in [
+            lambda: numbers.append('a'),
+            lambda: numbers.extend([1, 'a']),
+            lambda: numbers.insert(0, 'a'),
+            lambda: numbers.__setitem__(0, 'a'),
+            lambda: numbers.__setitem__(slice(0, 10, 2), ['a'] * 5),
+            lambda: numbers.__setslice__(0, 1, ['a']),
+        ]:
+            self.assertRaises(typeschema.ValidationError, change)
+        self.assertEqual(len(numbers), 1003)
+        self.assertNotIn('a', numbers)
+
+    def test_list_property(self):
+        class MyClass(object):
+            my_attr = ty.list(
+                'my_attr', default=[], items={'type': 'integer'})
+
+        a, b = MyClass(), MyClass()
+        self.assertIsInstance(a.my_attr, ty.ValidatedList)
+        a.my_attr.append(1)
+        self.assertEqual(b.my_attr, [])
+        self.assertRaises(
+            typeschema.ValidationError, setattr, a, 'my_attr', [1, 'a'])
+
+        # Already checked lists are assigned as they are.
+        b.my_attr = a.my_attr
+        self.assertIs(b.my_attr, a.my_attr)
+
+        copied = copy.deepcopy(a.my_attr)
+        self.assertEqual(copied, [1])
+        self.assertRaises(typeschema.ValidationError, copied.append, 'a')
+
+    def test_default_factory_is_converted(self):
+        class MyClass(object):
+            numbers = ty.list('numbers', default_factory=list,
+                              items={'type': 'integer'})
+            labels = ty.dict('labels', default_factory=dict,
+                             values={'type': 'integer'})
+
+        class MyModel(ty.Model):
+            numbers = MyClass.numbers
+            labels = MyClass.labels
+
+        for obj in [MyClass(), MyModel()]:
+            self.assertIsInstance(obj.numbers, ty.ValidatedList)
+            self.assertIsInstance(obj.labels, ty.ValidatedDict)
+            self.assertRaises(
+                typeschema.ValidationError, obj.numbers.append, 'a')
+            self.assertRaises(
+                typeschema.ValidationError, obj.labels.__setitem__, 'a', 'a')
+            obj.numbers.append(1)
+            self.assertEqual(obj.numbers, [1])
+
+    def test_dict_property(self):
+        class MyClass(object):
+            my_attr = ty.dict('my_attr', values={'type': 'integer'})
+
+        my = MyClass()
+        my.my_attr = {'a': 1}
+        self.assertIsInstance(my.my_attr, ty.ValidatedDict)
+        my.my_attr.update(b=2)
+        my.my_attr.setdefault('c', 3)
+        self.assertRaises(
+            typeschema.ValidationError, my.my_attr.update, {'d': 'a'})
+        self.assertRaises(
+            typeschema.ValidationError, my.my_attr.setdefault, 'd', 'a')
+        self.assertEqual(my.my_attr, {'a': 1, 'b': 2, 'c': 3})
+
+    def test_pickle_model_with_containers(self):
+        polygon = Polygon(points=[[1, 2]], labels={'a': 1})
+        polygon = pickle.loads(pickle.dumps(polygon, 2))
+        self.assertEqual(polygon.points, [[1, 2]])
+        self.assertRaises(typeschema.ValidationError, polygon.points.append, 1)
+        self.assertRaises(
+            typeschema.ValidationError, polygon.labels.__setitem__, 'b', 'a')
+
+
+class Polygon(ty.Model):
+    points = ty.list('points', items={'type': 'array'})
+    labels = ty.dict('labels', values={'type': 'integer'})
@@ -1,7 +1,10 @@
+import datetime
 import doctest
 import unittest
 
+import typeschema
 import typeschema.properties.time
+import typeschema.types.time
 
 
 class TestCase(unittest.TestCase):
@@ -10,3 +13,29 @@ class TestCase(unittest.TestCase):
                                         optionflags=doctest.ELLIPSIS)
         if fails > 0:
             self.fail('Doctest failed!')
+
+    def test_strings_are_parsed_once(self):
+        calls = []
+        coercions = dict(typeschema.types.time.coercions)
+
+        def to_date(value):
+            calls.append(value)
+            return typeschema.types.time.to_date(value)
+
+        coercions['date'] = to_date
+        checker = typeschema.Checker()
+        checker.extend(typeschema.types.time.types, coercions)
+        self.assertEqual(
+            checker.coerce('2013-01-13', 'date'), datetime.date(2013, 1, 13))
+        self.assertEqual(calls, ['2013-01-13'])
+
+    def test_property_error(self):
+        class MyClass(object):
+            my_attr = typeschema.properties.time.time('my_attr')
+
+        my = MyClass()
+        with self.assertRaises(typeschema.ValidationError) as cm:
+            my.my_attr = '25:00:00'
+        self.assertEqual(cm.exception.validator, 'anyOf')
+        my.my_attr = None
+        self.assertEqual(my.my_attr, None)
@@ -0,0 +1,99 @@
+import doctest
+import mmap
+import tempfile
+import unittest
+from StringIO import StringIO
+
+import typeschema
+import typeschema.stream
+
+
+class TestCase(unittest.TestCase):
+    def test_stream_doc(self):
+        fails, tested = doctest.testmod(typeschema.stream)
+        if fails > 0:
+            self.fail('Doctest failed!')
+
+    def test_ndjson_mmap(self):
+        f = tempfile.TemporaryFile()
+        f.write('1\n\n"a"\n2\n')
+        f.flush()
+        m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        errors = list(typeschema.stream.validate_ndjson(
+            m, {'type': 'integer'}))
+        self.assertEqual([offset for offset, error in errors], [3])
+        self.assertIsInstance(errors[0][1], typeschema.ValidationError)
+
+    def test_ndjson_custom_checker(self):
+        checker = typeschema.Checker()
+        checker.define('even', lambda x: x % 2 == 0)
+        errors = list(typeschema.stream.validate_ndjson(
+            StringIO('2\n3\n4\n'), {'type': 'even'}, checker=checker))
+        self.assertEqual([offset for offset, error in errors], [2])
+
+    def test_json_array_chunks(self):
+        items = ['{"a": [1, 2, 3], "b": "%s"}' % ('x' * i) for i in range(50)]
+        items[10] = '{"a": "nope"}'
+        data = '  [ ' + ',\n'.join(items) + ' ]  '
+        schema = {'properties': {'a': {'type': 'array'}}}
+        for chunk_size in [1, 3, 16, 1024]:
+            errors = list(typeschema.stream.validate_json_array(
+                StringIO(data), schema, chunk_size=chunk_size))
+            self.assertEqual([offset for offset, error in errors],
+                             [data.index('{"a": "nope"}')])
+
+    def test_json_array_empty(self):
+        self.assertEqual(list(typeschema.stream.validate_json_array(
+            StringIO('[]'), {'type': 'integer'})), [])
+
+    def test_json_array_malformed(self):
+        for data in ['{}', '[1, 2', '[1 2]', '[1, nope]']:
+            errors = list(typeschema.stream.validate_json_array(
+                StringIO(data), {'type': 'integer'}, chunk_size=2))
+            self.assertEqual(len(errors), 1, data)
+            self.assertIsInstance(errors[0][1], ValueError)
+
+    def test_json_array_trailing_comma(self):
+        for data in ['[1,]', '[1, ]', '[1, 2,\n]']:
+            errors = list(typeschema.stream.validate_json_array(
+                StringIO(data), {'type': 'integer'}, chunk_size=2))
+            self.assertEqual(len(errors), 1, data)
+            self.assertEqual(errors[0][0], data.index(']'), data)
+            self.assertIsInstance(errors[0][1], ValueError)
+
+    def test_json_array_trailing_data(self):
+        for data in ['[1] garbage', '[1]]', '[] 1']:
+            errors = list(typeschema.stream.validate_json_array(
+                StringIO(data), {'type': 'integer'}, chunk_size=2))
+            self.assertEqual(len(errors), 1, data)
+            self.assertIsInstance(errors[0][1], ValueError)
+        self.assertEqual(list(typeschema.stream.validate_json_array(
+            StringIO('[1] \n'), {'type': 'integer'}, chunk_size=2)), [])
+
+    def test_malformed_item_stops_reading(self):
+        rest = ', '.join(['{"a": [1, 2, 3]}'] * 100000) + ']'
+        for bad in ['nope', '{"a": nope}', '[1, 2 3]', '"a\nb"', 'tru']:
+            data = StringIO('[1, %s, %s' % (bad, rest))
+            errors = list(typeschema.stream.validate_json_array(
+                data, {'type': 'integer'}, chunk_size=1024))
+            self.assertEqual(len(errors), 1, bad)
+            self.assertIsInstance(errors[0][1], ValueError)
+            self.assertLess(data.tell(), 4096, bad)
+
+    def test_json_array_values_across_chunks(self):
+        items = ['"%s"' % ('x\\"' * 100), '[[{"a": "]"}]]', 'true', 'null',
+                 '-Infinity', '123456789']
+        data = '[' + ', '.join(items) + ']'
+        for chunk_size in [1, 2, 7]:
+            errors = list(typeschema.stream.validate_json_array(
+                StringIO(data), {'type': 'integer'}, chunk_size=chunk_size))
+            self.assertEqual([offset for offset, error in errors],
+                             [data.index(item) for item in items[:-1]])
+
+    def test_malformed_line_stops_reading(self):
+        data = StringIO('1\nnope\n' + '2\n' * 100000)
+        offset, error = next(typeschema.stream.validate_ndjson(
+            data, {'type': 'integer'}))
+        self.assertEqual(offset, 2)
+        self.assertIsInstance(error, ValueError)
+        self.assertLess(data.tell(), 4096)
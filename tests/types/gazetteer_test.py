@@ -0,0 +1,122 @@
+import doctest
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+import typeschema
+import typeschema.types.gazetteer
+from typeschema.types.gazetteer import Gazetteer, build_index, main
+from typeschema.types.location import City
+
+_GEONAMES = u'\n'.join([
+    u'3117735\tMadrid\tMadrid\tMadri,Madryt\t40.4\t-3.7\tP\tPPLC\tES',
+    u'3169070\tRome\tRome\tRoma,Rom\t41.9\t12.5\tP\tPPLC\tIT',
+    u'2950159\tBerlin\tBerlin\t\t52.5\t13.4\tP\tPPLC\tDE',
+    u'3688689\tBogot\xe1\tBogota\t\t4.6\t-74.1\tP\tPPLC\tCO',
+    u'# A comment',
+    u'',
+]).encode('utf-8')
+
+
+class TestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'cities.index')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_types_gazetteer_doc(self):
+        fails, tested = doctest.testmod(typeschema.types.gazetteer)
+        if fails > 0:
+            self.fail('Doctest failed!')
+
+    def test_contains(self):
+        cities = [('City %d' % i, 'ES') for i in range(1000)]
+        self.assertEqual(build_index(cities + [('city 1', 'es')],
+                                     self.path), 1000)
+        gazetteer = Gazetteer(self.path)
+        self.assertEqual(len(gazetteer), 1000)
+        for i in range(1000):
+            self.assertTrue(gazetteer.contains('City %d' % i, 'ES'))
+            self.assertFalse(gazetteer.contains('City %d' % i, 'FR'))
+            self.assertFalse(gazetteer.contains('City %d' % (i + 1000), 'ES'))
+        self.assertFalse(gazetteer.contains(None, 'ES'))
+        self.assertFalse(gazetteer.contains('\xff', 'ES'))
+
+    def test_empty_index(self):
+        self.assertEqual(build_index([], self.path), 0)
+        self.assertFalse(Gazetteer(self.path).contains('Madrid', 'ES'))
+
+    def test_not_an_index(self):
+        with open(self.path, 'wb') as f:
+            f.write('Madrid')
+        self.assertRaises(ValueError, Gazetteer, self.path)
+
+    def test_pickle(self):
+        build_index([('Madrid', 'ES')], self.path)
+        gazetteer = pickle.loads(pickle.dumps(Gazetteer(self.path)))
+        self.assertTrue(gazetteer.contains('Madrid', 'ES'))
+
+    def test_rebuild_while_open(self):
+        build_index([('Madrid', 'ES')], self.path)
+        old = Gazetteer(self.path)
+        build_index([('Roma', 'IT')], self.path)
+        self.assertTrue(old.contains('Madrid', 'ES'))
+        self.assertTrue(Gazetteer(self.path).contains('Roma', 'IT'))
+        self.assertEqual(os.listdir(self.directory), ['cities.index'])
+
+    def test_command(self):
+        geonames = os.path.join(self.directory, 'cities.txt')
+        with open(geonames, 'wb') as f:
+            f.write(_GEONAMES)
+
+        main([geonames, self.path])
+        gazetteer = Gazetteer(self.path)
+        self.assertTrue(gazetteer.contains('Rome', 'IT'))
+        self.assertTrue(gazetteer.contains(u'bogot\xe1', 'CO'))
+        self.assertTrue(gazetteer.contains('Bogota', 'CO'))
+        self.assertFalse(gazetteer.contains('Roma', 'IT'))
+
+        main(['--alternate-names', geonames, self.path])
+        gazetteer = Gazetteer(self.path)
+        self.assertTrue(gazetteer.contains('Roma', 'IT'))
+        self.assertTrue(gazetteer.contains('Madryt', 'ES'))
+        self.assertEqual(len(gazetteer), 9)
+
+    def test_unicode(self):
+        self.assertEqual(build_index([(u'M\xe1laga', u'ES'),
+                                      (u'M\xe1laga', 'es ')], self.path), 1)
+        gazetteer = Gazetteer(self.path)
+        self.assertTrue(gazetteer.contains(u'M\xe1laga', u'ES'))
+        self.assertTrue(gazetteer.contains('M\xc3\xa1laga', 'ES'))
+        self.assertFalse(gazetteer.contains(u'M\xe1laga', u'\xc9S'))
+        self.assertFalse(gazetteer.contains(u'M\xe1laga', None))
+
+    def test_city_type(self):
+        build_index([('Madrid', 'ES')], self.path)
+        checker = typeschema.Checker()
+        checker.define('city', Gazetteer(self.path).is_city)
+        self.assertTrue(checker.is_valid(['Madrid', 'ES'], {'type': 'city'}))
+        self.assertTrue(checker.is_valid((' madrid', u'es '),
+                                         {'type': 'city'}))
+        self.assertFalse(checker.is_valid(['Madrid', 'FR'], {'type': 'city'}))
+        self.assertFalse(checker.is_valid(['Madrid', None], {'type': 'city'}))
+        self.assertFalse(checker.is_valid(['Madrid'], {'type': 'city'}))
+        self.assertFalse(checker.is_valid('ES', {'type': 'city'}))
+        self.assertFalse(checker.is_valid(None, {'type': 'city'}))
+
+    def test_city_type_with_country_names(self):
+        build_index([('Madrid', 'ES')], self.path)
+        checker = typeschema.Checker()
+        checker.define('city', Gazetteer(self.path).is_city)
+        self.assertTrue(checker.is_valid(City('Madrid', 'Spain'),
+                                         {'type': 'city'}))
+        self.assertTrue(checker.is_valid(['Madrid', 'Spain'],
+                                         {'type': 'city'}))
+        self.assertFalse(checker.is_valid(['Madrid', 'France'],
+                                          {'type': 'city'}))
+        self.assertFalse(checker.is_valid(['Madrid', 'Foo'],
+                                          {'type': 'city'}))
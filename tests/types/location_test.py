@@ -9,3 +9,16 @@ class TestCase(unittest.TestCase):
         fails, tested = doctest.testmod(typeschema.types.location)
         if fails > 0:
             self.fail('Doctest failed!')
+
+    def test_countries_are_shared(self):
+        location = typeschema.types.location
+        spain = location.find_country('Spain')
+        self.assertEqual(spain.name, 'Spain')
+        self.assertIs(location.find_country('Spain'), spain)
+        self.assertIs(location.City('Madrid', 'Spain').country, spain)
+        self.assertTrue(location.is_country(u'Spain'))
+        self.assertFalse(location.is_country('Foo'))
+        self.assertFalse(location.is_country(None))
+        self.assertIsNone(location._lookups.get('Foo', 'missing'))
+        self.assertLessEqual(len(location._lookups),
+                             location._lookups.maxsize)
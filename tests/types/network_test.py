@@ -1,6 +1,11 @@
 import doctest
 import unittest
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 import typeschema.types.network
 
 
@@ -9,3 +14,86 @@ class TestCase(unittest.TestCase):
         fails, tested = doctest.testmod(typeschema.types.network)
         if fails > 0:
             self.fail('Doctest failed!')
+
+    def test_strict_addresses(self):
+        network = typeschema.types.network
+        for value in ['1', '1.2.3', '01.2.3.4', '1.2.3.256', ' 1.2.3.4',
+                      '1.2.3.4\0', u'\xe9', None, 16909060, []]:
+            self.assertFalse(network.is_ip(value), value)
+        self.assertTrue(network.is_ipv4(u'1.2.3.4'))
+        self.assertFalse(network.is_ipv6('1.2.3.4'))
+        self.assertTrue(network.is_ipv6('::ffff:1.2.3.4'))
+        self.assertFalse(network.is_ipv4('::1'))
+        self.assertTrue(network.is_ip('fe80::1'))
+
+    def test_cidr(self):
+        network = typeschema.types.network
+        for value in ['0.0.0.0/0', '10.0.0.0/8', '::/0', '::1/128',
+                      u'fe80::/10']:
+            self.assertTrue(network.is_cidr(value), value)
+        for value in ['10.0.0.0', '10.0.0.0/08', '10.0.0.0/33', '::/129',
+                      '10.0.0.0/+8', '10.0.0.0/ 8', '10.0.0.0/8/8',
+                      '10.0.0.1/8', 'fe80::1/10', None]:
+            self.assertFalse(network.is_cidr(value), value)
+
+    def test_integers(self):
+        network = typeschema.types.network
+        for value, version in [('0.0.0.0', 4), ('255.255.255.255', 4),
+                               ('::', 6), ('::1', 6),
+                               ('ffff:ffff:ffff:ffff:ffff:ffff:ffff:ffff', 6)]:
+            number = network.ip_to_int(value, version)
+            self.assertEqual(network.int_to_ip(number, version), value)
+        self.assertEqual(network.ip_to_int('ffff::'), 0xffff << 112)
+
+    def test_networks(self):
+        networks = typeschema.types.network.Networks(
+            allow=['10.0.0.0/8', '10.66.6.0/24', '2001:db8::/32',
+                   '0.0.0.0/32'],
+            deny=['10.66.0.0/16', '2001:db8::1/128'])
+        for value, accepted in [
+            ('10.0.0.0', True), ('10.255.255.255', True),
+            ('10.66.0.1', False), ('10.66.6.6', True), ('10.66.7.1', False),
+            ('11.0.0.0', False), ('0.0.0.0', True), ('0.0.0.1', False),
+            ('2001:db8::2', True), ('2001:db8::1', False), ('::1', False),
+            ('::a00:1', False), (None, False), ('10', False),
+        ]:
+            self.assertEqual(networks(value), accepted, value)
+
+        only_deny = typeschema.types.network.Networks(deny=['10.0.0.0/8'])
+        self.assertFalse(only_deny('10.0.0.1'))
+        self.assertTrue(only_deny('11.0.0.1'))
+        self.assertFalse(only_deny('Foo'))
+        self.assertTrue(typeschema.types.network.Networks(
+            allow=['0.0.0.0/0'])('1.2.3.4'))
+
+        self.assertRaises(ValueError, typeschema.types.network.Networks,
+                          allow=['10.0.0.0/8'], deny=['10.0.0.0/8'])
+        self.assertRaises(ValueError, typeschema.types.network.Networks,
+                          allow=['10.0.0.1/8'])
+
+    def test_networks_check_many(self):
+        networks = typeschema.types.network.Networks(
+            allow=['10.0.0.0/8', '::/0'], deny=['10.66.0.0/16'])
+        values = ['10.0.0.1', '10.66.0.1', '::1', 'Foo', None, '11.0.0.1']
+        expected = [True, False, True, False, False, False]
+        self.assertEqual(
+            [True if accepted else False
+             for accepted in networks.check_many(values)],
+            expected)
+        self.assertEqual(
+            [True if accepted else False
+             for accepted in networks.check_many(values[2:5])],
+            expected[2:5])
+
+    @unittest.skipIf(numpy is None, 'NumPy is not installed')
+    def test_networks_check_many_vectorized(self):
+        networks = typeschema.types.network.Networks(
+            allow=['10.0.0.0/8'], deny=['10.66.0.0/16'])
+        numbers = numpy.array(
+            [0x0a000001, 0x0a420001, 0x0b000001, -1, 2 ** 40],
+            dtype=numpy.int64)
+        self.assertEqual(networks.check_many(numbers).tolist(),
+                         [True, False, False, False, False])
+        self.assertEqual(
+            networks.check_many(numbers[:3].astype(numpy.uint32)).tolist(),
+            [True, False, False])
@@ -1,8 +1,14 @@
+import datetime
 import doctest
 import unittest
 
 import typeschema.types.time
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 
 class TestCase(unittest.TestCase):
     def test_types_time_doc(self):
@@ -10,3 +16,94 @@ class TestCase(unittest.TestCase):
                                         optionflags=doctest.ELLIPSIS)
         if fails > 0:
             self.fail('Doctest failed!')
+
+    def test_fast_path_agrees_with_strptime(self):
+        t = typeschema.types.time
+        for value in ['2013-01-13T23:52:37Z', '2000-02-29T00:00:00Z',
+                      '2013-1-3T1:2:3Z']:
+            self.assertEqual(t.to_datetime(value), datetime.datetime.strptime(
+                value, '%Y-%m-%dT%H:%M:%SZ'))
+        for value in ['2013-01-13', '2013-1-3']:
+            self.assertEqual(t.to_date(value), datetime.datetime.strptime(
+                value, '%Y-%m-%d').date())
+        self.assertEqual(t.to_time('23:52:37'), datetime.time(23, 52, 37))
+
+    def test_fractions_and_offsets(self):
+        t = typeschema.types.time
+        self.assertEqual(t.to_datetime('2013-01-13T23:52:37.25Z'),
+                         datetime.datetime(2013, 1, 13, 23, 52, 37, 250000))
+        self.assertEqual(t.to_datetime('2013-01-13T23:52:37-01:30'),
+                         datetime.datetime(2013, 1, 14, 1, 22, 37))
+        self.assertEqual(t.to_time(u'23:52:37.1234567'),
+                         datetime.time(23, 52, 37, 123456))
+
+    def test_invalid_strings(self):
+        t = typeschema.types.time
+        for value in ['2013-13-13T23:52:37Z', '2013-01-13T23:52:37+24:00',
+                      '2013-01-13T23:52:37', '2013-01-13 23:52:37Z',
+                      '2013-02-29T00:00:00Z', u'\u0662013-01-13T23:52:37Z']:
+            self.assertFalse(t.is_datetime(value), value)
+        for value in ['2013-02-30', '2013-01-13T00:00:00Z', '']:
+            self.assertFalse(t.is_date(value), value)
+        for value in ['24:00:00', '23:52', '23:52:37Z']:
+            self.assertFalse(t.is_time(value), value)
+
+    def test_offsets_out_of_range(self):
+        t = typeschema.types.time
+        for value in ['0001-01-01T00:00:00+01:00',
+                      '9999-12-31T23:59:59-01:00']:
+            self.assertFalse(t.is_datetime(value), value)
+            self.assertRaises(ValueError, t.to_datetime, value)
+        self.assertEqual(t.to_datetime('0001-01-01T01:00:00+01:00'),
+                         datetime.datetime(1, 1, 1))
+
+    def test_to_datetimes(self):
+        values = [0, 1.5, float('nan'), 1e20, datetime.datetime(2013, 1, 13),
+                  '2013-01-13T23:52:37Z', '2013-02-29T00:00:00Z',
+                  '2013-01-13T23:52:37.5+01:00', None]
+        expected = [
+            datetime.datetime(1970, 1, 1),
+            datetime.datetime(1970, 1, 1, 0, 0, 1, 500000),
+            None,
+            None,
+            datetime.datetime(2013, 1, 13),
+            datetime.datetime(2013, 1, 13, 23, 52, 37),
+            None,
+            datetime.datetime(2013, 1, 13, 22, 52, 37, 500000),
+            None,
+        ]
+        mask, converted = typeschema.types.time.to_datetimes(values)
+        self.assertEqual([bool(valid) for valid in mask],
+                         [value is not None for value in expected])
+        if numpy is not None:
+            converted = [
+                value.astype(object) if valid else None
+                for valid, value in zip(mask, converted)
+            ]
+        self.assertEqual(list(converted), expected)
+
+    @unittest.skipIf(numpy is None, 'NumPy is not installed')
+    def test_to_datetimes_vectorized(self):
+        strings = numpy.array([
+            '2013-01-13T23:52:37Z', '2012-02-29T00:00:00Z',
+            '2013-02-29T00:00:00Z', '2013-01-13T23:52:37',
+            '0001-01-01T00:00:00Z',
+            '2013-01-13T23:52:37.5Z', 'Foo',
+        ])
+        mask, converted = typeschema.types.time.to_datetimes(strings)
+        self.assertEqual(
+            list(mask), [True, True, False, False, True, True, False])
+        self.assertEqual(list(converted[mask].astype(object)), [
+            datetime.datetime(2013, 1, 13, 23, 52, 37),
+            datetime.datetime(2012, 2, 29),
+            datetime.datetime(1, 1, 1),
+            datetime.datetime(2013, 1, 13, 23, 52, 37, 500000),
+        ])
+
+        mask, converted = typeschema.types.time.to_datetimes(
+            numpy.array([0, 1358121157, numpy.nan, 1e20]))
+        self.assertEqual(list(mask), [True, True, False, False])
+        self.assertEqual(list(converted[mask].astype(object)), [
+            datetime.datetime(1970, 1, 1),
+            datetime.datetime(2013, 1, 13, 23, 52, 37),
+        ])
@@ -2,6 +2,7 @@ import doctest
 import unittest
 
 import typeschema
+import typeschema._cache
 
 
 class TestCase(unittest.TestCase):
@@ -9,3 +10,223 @@ class TestCase(unittest.TestCase):
         fails, tested = doctest.testmod(typeschema.typeschema)
         if fails > 0:
             self.fail('Doctest failed!')
+
+    def test_cache_reuses_validators(self):
+        checker = typeschema.Checker()
+        checker.check(1, {'type': 'integer'})
+        checker.check(2, {'type': 'integer'})
+        checker.check('a', {'type': 'string'})
+        info = checker.cache_info()
+        self.assertEqual(info.hits, 1)
+        self.assertEqual(info.misses, 2)
+        self.assertEqual(info.currsize, 2)
+
+    def test_cache_evicts_least_recently_used(self):
+        checker = typeschema.Checker(cache_size=2)
+        checker.check(1, {'type': 'integer'})
+        checker.check('a', {'type': 'string'})
+        checker.check(1, {'type': 'integer'})
+        checker.check(None, {'type': 'null'})
+        self.assertEqual(checker.cache_info().currsize, 2)
+        checker.check(1, {'type': 'integer'})
+        checker.check('a', {'type': 'string'})
+        self.assertEqual(checker.cache_info().misses, 4)
+
+    def test_define_invalidates_cache(self):
+        checker = typeschema.Checker()
+        checker.define('small', {'type': 'integer', 'maximum': 10})
+        checker.check(5, {'type': 'small'})
+        checker.define('small', {'type': 'integer', 'maximum': 1})
+        self.assertEqual(checker.cache_info().currsize, 0)
+        self.assertRaises(typeschema.ValidationError,
+                          checker.check, 5, {'type': 'small'})
+
+    def test_cached_schema_is_not_shared(self):
+        checker = typeschema.Checker()
+        schema = {'type': 'integer'}
+        checker.check(1, schema)
+        schema['type'] = 'string'
+        checker.check(1, {'type': 'integer'})
+        checker.check('a', schema)
+
+    def test_unhashable_schema_skips_cache(self):
+        checker = typeschema.Checker()
+        checker.check(set([1]), {'enum': [set([1])]})
+        self.assertEqual(checker.cache_info().currsize, 0)
+
+    def test_is_valid_builds_no_errors(self):
+        checker = typeschema.Checker()
+        checker.define('small', {'type': 'integer', 'maximum': 10})
+        schema = {'anyOf': [{'type': 'small'}, {'type': 'null'}]}
+
+        built = []
+        original_init = typeschema.ValidationError.__init__
+
+        def init(self, *args, **kwargs):
+            built.append(self)
+            original_init(self, *args, **kwargs)
+
+        typeschema.ValidationError.__init__ = init
+        try:
+            self.assertTrue(checker.is_valid(None, schema))
+            self.assertFalse(checker.is_valid(50, schema))
+            self.assertFalse(checker.is_valid('a', schema))
+            # jsonschema itself checks the type without errors too.
+            small = checker._validator.DEFAULT_TYPES['small']
+            self.assertFalse(isinstance(50, small))
+        finally:
+            typeschema.ValidationError.__init__ = original_init
+        self.assertEqual(built, [])
+
+    def test_is_valid_wrapper(self):
+        self.assertTrue(typeschema.is_valid(1, {'type': 'integer'}))
+        self.assertFalse(typeschema.is_valid('1', {'type': 'integer'}))
+
+    def test_check_many(self):
+        checker = typeschema.Checker()
+        schema = {'type': 'integer'}
+        values = [1, 'a', 2, None]
+        self.assertEqual(
+            checker.check_many(values, schema, typeschema.INVALID_INDICES),
+            [1, 3])
+
+        results = checker.check_many(values, schema, typeschema.COLLECT_ALL)
+        self.assertEqual(len(results), 4)
+        self.assertIsNone(results[0])
+        self.assertEqual(results[1].instance, 'a')
+        self.assertEqual(list(results[1].path), [])
+
+        try:
+            checker.check_many(values, schema, typeschema.FAIL_FAST)
+            self.fail('ValidationError not raised')
+        except typeschema.ValidationError as e:
+            self.assertEqual(list(e.path), [1])
+        self.assertIsNone(
+            checker.check_many([1, 2], schema, typeschema.FAIL_FAST))
+
+    def test_check_many_accepts_iterators(self):
+        values = (i for i in [1, 'a'])
+        self.assertEqual(
+            typeschema.check_many(values, {'type': 'integer'},
+                                  typeschema.INVALID_INDICES),
+            [1])
+
+    def test_check_many_unknown_mode(self):
+        self.assertRaises(ValueError, typeschema.check_many,
+                          [], {'type': 'integer'}, 'foo')
+
+    def test_to_validate_method(self):
+        class Pair(object):
+            def __init__(self, a, b):
+                self.a, self.b = a, b
+
+            def to_validate(self):
+                return [self.a, self.b]
+
+        class OldPair:
+            def to_validate(self):
+                return [1, 2]
+
+        schema = {'type': 'array', 'minItems': 2}
+        typeschema.check(Pair(1, 2), schema)
+        typeschema.check(OldPair(), schema)
+        self.assertFalse(typeschema.is_valid(Pair(1, 2), {'type': 'object'}))
+
+    def test_instance_to_validate(self):
+        class Box(object):
+            pass
+
+        class OldBox:
+            pass
+
+        schema = {'type': 'integer'}
+        for cls in [Box, OldBox]:
+            box = cls()
+            self.assertFalse(typeschema.is_valid(box, schema))
+            box.to_validate = lambda: 1
+            typeschema.check(box, schema)
+            self.assertFalse(typeschema.is_valid(cls(), schema))
+
+    def test_adapted_classes_are_bounded(self):
+        adapted = typeschema.typeschema._adapters_by_class
+        for i in range(typeschema.typeschema._MAX_ADAPTED_CLASSES + 10):
+            cls = type('Dynamic%d' % i, (object,), {
+                'to_validate': lambda self: 1})
+            typeschema.check(cls(), {'type': 'integer'})
+            self.assertLessEqual(
+                len(adapted), typeschema.typeschema._MAX_ADAPTED_CLASSES)
+
+    def test_register_adapter(self):
+        class Base(object):
+            def __init__(self, value):
+                self.value = value
+
+        class Derived(Base):
+            pass
+
+        schema = {'type': 'integer'}
+        self.assertFalse(typeschema.is_valid(Derived(1), schema))
+        typeschema.register_adapter(Base, lambda obj: obj.value)
+        try:
+            typeschema.check(Base(1), schema)
+            typeschema.check(Derived(1), schema)
+            self.assertEqual(
+                typeschema.check_many([Derived(1), Derived('a')], schema,
+                                      typeschema.INVALID_INDICES),
+                [1])
+        finally:
+            del typeschema.typeschema._adapters[Base]
+            typeschema.typeschema._adapters_by_class.clear()
+
+    def test_memoize(self):
+        calls = []
+
+        def is_short(value):
+            calls.append(value)
+            return len(value) < 3
+
+        checker = typeschema.Checker()
+        checker.define('short', is_short,
+                       memoize=typeschema.Memoize(maxsize=2))
+        schema = {'type': 'short'}
+        for value in ['a', 'a', 'abcd', 'a', ('a',), ['a'], ['a']]:
+            checker.is_valid(value, schema)
+        self.assertEqual(calls, ['a', 'abcd', ('a',), ['a'], ['a']])
+        info = checker.memo_info('short')
+        self.assertEqual((info.hits, info.misses, info.currsize), (2, 3, 2))
+        self.assertEqual(info.hit_rate, 0.4)
+
+        # Failed checks go through jsonschema, and hit the cache too.
+        self.assertRaises(typeschema.ValidationError,
+                          checker.check, 'abcd', schema)
+
+    def test_memoize_ttl(self):
+        now = [0]
+        cache = typeschema._cache.LRUCache(10, ttl=5, timer=lambda: now[0])
+        cache.put('a', 1)
+        now[0] = 4
+        self.assertEqual(cache.get('a'), 1)
+        now[0] = 5
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 0)
+
+    def test_memoize_only_functions(self):
+        checker = typeschema.Checker()
+        self.assertRaises(ValueError, checker.define,
+                          'foo', {'type': 'integer'}, memoize=True)
+        self.assertRaises(ValueError, checker.define, 'foo', int,
+                          memoize=True)
+        checker.define('foo', lambda x: True)
+        self.assertRaises(ValueError, checker.memo_info, 'foo')
+
+    def test_coerce(self):
+        checker = typeschema.Checker()
+        self.assertRaises(ValueError, checker.define, 'foo', None)
+        checker.define('foo', None, coerce=int, memoize=True)
+        self.assertEqual(checker.coerce('12', 'foo'), 12)
+        self.assertFalse(checker.is_valid('a', {'type': 'foo'}))
+        self.assertRaises(ValueError, checker.coerce, 1, 'integer')
+
+        # Redefining the type without coerce drops it.
+        checker.define('foo', {'type': 'string'})
+        self.assertRaises(ValueError, checker.coerce, '12', 'foo')
@@ -0,0 +1,218 @@
+"""
+Caching helpers used internally by typeschema.
+"""
+
+import collections
+import datetime
+import threading
+import time
+
+
+class CacheInfo(collections.namedtuple(
+        'CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])):
+    __slots__ = ()
+
+    @property
+    def hit_rate(self):
+        """
+        Fraction of the lookups that were hits, or ``None`` if there were no
+        lookups.
+        """
+
+        lookups = self.hits + self.misses
+        if not lookups:
+            return None
+        return float(self.hits) / lookups
+
+
+class LRUCache(object):
+    """
+    A thread-safe mapping bounded to ``maxsize`` entries, evicting the least
+    recently used one when full.
+
+    Args:
+        maxsize: Maximum number of entries. ``None`` means unbounded, ``0``
+            disables the cache.
+        ttl: If given, entries expire after this number of seconds.
+        timer: Function returning the current time in seconds.
+
+    >>> cache = LRUCache(2)
+    >>> cache.put('a', 1)
+    >>> cache.put('b', 2)
+    >>> cache.get('a')
+    1
+    >>> cache.put('c', 3)
+    >>> print cache.get('b')
+    None
+    >>> cache.info()
+    CacheInfo(hits=1, misses=1, maxsize=2, currsize=2)
+    >>> cache.info().hit_rate
+    0.5
+    """
+
+    # Each link is [prev, next, key, value, expiration time].
+    _PREV, _NEXT, _KEY, _VALUE, _EXPIRES = 0, 1, 2, 3, 4
+
+    def __init__(self, maxsize=128, ttl=None, timer=time.time):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+        self._map = {}
+        self._root = []
+        self._root[:] = [self._root, self._root, None, None, None]
+
+    def get(self, key, default=None):
+        with self._lock:
+            link = self._map.get(key)
+            if link is not None and self.ttl is not None and (
+                link[self._EXPIRES] <= self.timer()
+            ):
+                self._unlink(link)
+                del self._map[key]
+                link = None
+            if link is None:
+                self.misses += 1
+                return default
+            self._unlink(link)
+            self._append(link)
+            self.hits += 1
+            return link[self._VALUE]
+
+    def put(self, key, value):
+        if self.maxsize == 0:
+            return
+        expires = None
+        if self.ttl is not None:
+            expires = self.timer() + self.ttl
+        with self._lock:
+            link = self._map.get(key)
+            if link is not None:
+                self._unlink(link)
+                link[self._VALUE] = value
+                link[self._EXPIRES] = expires
+                self._append(link)
+                return
+            if self.maxsize is not None and len(self._map) >= self.maxsize:
+                oldest = self._root[self._NEXT]
+                self._unlink(oldest)
+                del self._map[oldest[self._KEY]]
+            link = [None, None, key, value, expires]
+            self._append(link)
+            self._map[key] = link
+
+    def clear(self):
+        with self._lock:
+            self._map.clear()
+            self._root[:] = [self._root, self._root, None, None, None]
+
+    def info(self):
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._map))
+
+    def __len__(self):
+        return len(self._map)
+
+    def _unlink(self, link):
+        prev, next = link[self._PREV], link[self._NEXT]
+        prev[self._NEXT] = next
+        next[self._PREV] = prev
+
+    def _append(self, link):
+        root = self._root
+        last = root[self._PREV]
+        link[self._PREV] = last
+        link[self._NEXT] = root
+        last[self._NEXT] = link
+        root[self._PREV] = link
+
+
+_SCALARS = frozenset([str, unicode, int, long, float, bool, type(None)])
+
+# Types whose values can be memoized, besides tuples and frozensets.
+_IMMUTABLES = _SCALARS | frozenset([
+    datetime.date, datetime.datetime, datetime.time, datetime.timedelta,
+])
+
+_missing = object()
+
+
+class MemoizedPredicate(object):
+    """
+    Wraps a pure function ``(value) -> bool``, remembering its results for
+    hashable, immutable values in a ``LRUCache``.
+
+    >>> calls = []
+    >>> def is_even(x):
+    ...     calls.append(x)
+    ...     return x % 2 == 0
+    >>> is_even = MemoizedPredicate(is_even, LRUCache(10))
+    >>> is_even(2), is_even(2), is_even(3)
+    (True, True, False)
+    >>> calls
+    [2, 3]
+    """
+
+    def __init__(self, predicate, cache):
+        self.predicate = predicate
+        self.cache = cache
+
+    def __getstate__(self):
+        # The results aren't worth pickling, and the lock can't be.
+        return {
+            'predicate': self.predicate,
+            'maxsize': self.cache.maxsize,
+            'ttl': self.cache.ttl,
+        }
+
+    def __setstate__(self, state):
+        self.__init__(
+            state['predicate'], LRUCache(state['maxsize'], state['ttl']))
+
+    def __call__(self, value):
+        cls = value.__class__
+        if cls not in _IMMUTABLES and not isinstance(
+            value, (tuple, frozenset)
+        ):
+            return self.predicate(value)
+
+        # The class is part of the key so that e.g. 1 and True don't collide.
+        key = (cls, value)
+        try:
+            result = self.cache.get(key, _missing)
+        except TypeError:
+            # A tuple with unhashable items.
+            return self.predicate(value)
+
+        if result is _missing:
+            result = True if self.predicate(value) else False
+            self.cache.put(key, result)
+        return result
+
+
+def fingerprint(schema):
+    """
+    Returns a hashable value that identifies a JSON schema by its contents.
+
+    Two schemas get the same fingerprint when they are equal and their leaves
+    have the same types, so ``1`` and ``True`` never collide. Raises
+    ``TypeError`` if some leaf isn't hashable.
+
+    >>> fingerprint({'type': 'integer'}) == fingerprint({'type': 'integer'})
+    True
+    >>> fingerprint({'enum': [1]}) == fingerprint({'enum': [True]})
+    False
+    """
+
+    cls = type(schema)
+    if cls in _SCALARS:
+        return (cls, schema)
+    if isinstance(schema, dict):
+        items = [(k, fingerprint(v)) for k, v in schema.iteritems()]
+        items.sort()
+        return (dict, tuple(items))
+    if isinstance(schema, (list, tuple)):
+        return (cls, tuple([fingerprint(v) for v in schema]))
+    hash(schema)
+    return (cls, schema)
@@ -0,0 +1,387 @@
+"""
+Generation of specialized Python predicates for JSON schemas.
+
+The generated function only answers whether a value is valid. It mirrors the
+keyword semantics of the jsonschema Draft 4 validators, so the generic
+validator is only needed to report why a value is not valid.
+"""
+
+import numbers
+import re
+
+from jsonschema import _utils
+from jsonschema._validators import FLOAT_TOLERANCE
+
+
+class Unsupported(Exception):
+    """
+    Raised when a schema uses something the generator doesn't handle, in
+    which case the generic validator must be used instead.
+    """
+
+
+def generate(schema, validator, definitions, compile_schema):
+    """
+    Generates a function ``(value) -> bool`` for a schema.
+
+    Args:
+        schema: A JSON schema.
+        validator: A jsonschema validator instance, used for its type table.
+        definitions: A dictionary of the custom types defined in the checker,
+            indexed by name.
+        compile_schema: A function returning a compiled schema, used for
+            types defined with a schema.
+
+    Returns:
+        A tuple with the source code and the function.
+
+    Raises:
+        Unsupported
+
+    >>> import typeschema
+    >>> validator = typeschema.Checker()._validator({})
+    >>> source, is_valid = generate(
+    ...     {'anyOf': [{'type': 'integer'}, {'type': 'null'}]},
+    ...     validator, {}, None)
+    >>> print source
+    def is_valid(v):
+        return ((isinstance(v, _T0) and not isinstance(v, bool)) or (v is None))
+    <BLANKLINE>
+    >>> is_valid(1), is_valid(None), is_valid(True), is_valid('1')
+    (True, True, False, False)
+    """
+
+    return _Generator(validator, definitions, compile_schema).generate(schema)
+
+
+def _multiple_of_float(value, divisor):
+    mod = value % divisor
+    return not (mod > FLOAT_TOLERANCE and (divisor - mod) > FLOAT_TOLERANCE)
+
+
+class _Generator(object):
+    # Keywords checked first, since they are cheap and usually decisive.
+    _FIRST = ('type', 'enum')
+
+    def __init__(self, validator, definitions, compile_schema):
+        self.validator = validator
+        self.definitions = definitions
+        self.compile_schema = compile_schema
+        self.env = {
+            '_find_additional': _utils.find_additional_properties,
+            '_multiple_of_float': _multiple_of_float,
+            '_uniq': _utils.uniq,
+        }
+        self.blocks = []
+        self.type_helpers = {}
+        self.counter = 0
+
+    def generate(self, schema):
+        expr = self.expr(schema, 'v')
+        lines = []
+        for block in self.blocks:
+            lines.extend(block)
+        lines.append('def is_valid(v):')
+        lines.append('    return ' + expr)
+        source = '\n'.join(lines) + '\n'
+        exec compile(source, '<typeschema>', 'exec') in self.env
+        return source, self.env['is_valid']
+
+    def name(self, prefix):
+        name = '_%s%d' % (prefix, self.counter)
+        self.counter += 1
+        return name
+
+    def constant(self, value, prefix='c'):
+        name = self.name(prefix)
+        self.env[name] = value
+        return name
+
+    def helper(self, body):
+        """
+        Emits a function taking ``v`` with the given body lines and returns
+        its name.
+        """
+
+        name = self.name('h')
+        self.blocks.append(
+            ['def %s(v):' % name] + ['    ' + line for line in body])
+        return name
+
+    def expr(self, schema, var):
+        """
+        Returns a boolean expression that tells whether ``var``, which must be
+        an identifier, is valid against ``schema``.
+        """
+
+        if not isinstance(schema, dict) or u'$ref' in schema:
+            raise Unsupported()
+
+        keys = [k for k in self._FIRST if k in schema]
+        keys += [k for k in schema if k not in self._FIRST]
+
+        conds = []
+        for key in keys:
+            if key not in self.validator.VALIDATORS:
+                continue
+            method = getattr(self, '_kw_' + key, None)
+            if method is None:
+                raise Unsupported(key)
+            cond = method(schema[key], var, schema)
+            if cond is not None:
+                conds.append(cond)
+
+        if not conds:
+            return 'True'
+        if len(conds) == 1:
+            return conds[0]
+        return '(%s)' % ' and '.join(conds)
+
+    def is_type(self, var, name):
+        types = self.validator._types
+        try:
+            if name not in types:
+                raise Unsupported(name)
+        except TypeError:
+            raise Unsupported(name)
+
+        if name in self.definitions:
+            definition = self.definitions[name]
+            if not isinstance(definition, type):
+                return '%s(%s)' % (self.type_helper(name, definition), var)
+
+        pytypes = types[name]
+        if pytypes is type(None):
+            return '(%s is None)' % var
+        flat = _utils.flatten(pytypes)
+        pytypes = self.constant(pytypes, 'T')
+        # bool inherits from int, so bools aren't numbers for jsonschema.
+        if bool not in flat and any(
+            issubclass(t, numbers.Number) for t in flat
+        ):
+            return '(isinstance(%s, %s) and not isinstance(%s, bool))' % (
+                var, pytypes, var)
+        return 'isinstance(%s, %s)' % (var, pytypes)
+
+    def type_helper(self, name, definition):
+        if name not in self.type_helpers:
+            if callable(definition):
+                predicate = definition
+            else:
+                predicate = self.compile_schema(definition).is_valid
+            predicate = self.constant(predicate, 'd')
+            # Same behavior as the types created by Checker.define.
+            self.type_helpers[name] = self.helper([
+                'try:',
+                '    return True if %s(v) else False' % predicate,
+                'except:',
+                '    return False',
+            ])
+        return self.type_helpers[name]
+
+    def guarded(self, var, name, cond):
+        return '(not %s or %s)' % (self.is_type(var, name), cond)
+
+    def _kw_type(self, types, var, schema):
+        types = _utils.ensure_list(types)
+        if not types:
+            return 'False'
+        if len(types) == 1:
+            return self.is_type(var, types[0])
+        return '(%s)' % ' or '.join(self.is_type(var, t) for t in types)
+
+    def _kw_enum(self, enums, var, schema):
+        if isinstance(enums, (list, tuple)):
+            try:
+                enums = frozenset(enums)
+            except TypeError:
+                pass
+        return '(%s in %s)' % (var, self.constant(enums, 'E'))
+
+    def _kw_allOf(self, allOf, var, schema):
+        if not allOf:
+            return None
+        return '(%s)' % ' and '.join(self.expr(s, var) for s in allOf)
+
+    def _kw_anyOf(self, anyOf, var, schema):
+        if not anyOf:
+            return 'False'
+        return '(%s)' % ' or '.join(self.expr(s, var) for s in anyOf)
+
+    def _kw_oneOf(self, oneOf, var, schema):
+        if not oneOf:
+            return 'False'
+        return '((%s) == 1)' % ' + '.join(self.expr(s, var) for s in oneOf)
+
+    def _kw_not(self, not_schema, var, schema):
+        return '(not %s)' % self.expr(not_schema, var)
+
+    # Written as the negation of the condition jsonschema fails on, so that
+    # NaN is accepted as it is there.
+    def _kw_minimum(self, minimum, var, schema):
+        op = '<=' if schema.get('exclusiveMinimum', False) else '<'
+        return self.guarded(var, 'number', 'not (float(%s) %s %s)' % (
+            var, op, self.constant(minimum)))
+
+    def _kw_maximum(self, maximum, var, schema):
+        op = '>=' if schema.get('exclusiveMaximum', False) else '>'
+        return self.guarded(var, 'number', 'not (%s %s %s)' % (
+            var, op, self.constant(maximum)))
+
+    def _kw_multipleOf(self, dB, var, schema):
+        if isinstance(dB, float):
+            cond = '_multiple_of_float(%s, %s)' % (var, self.constant(dB))
+        else:
+            cond = 'not (%s %% %s)' % (var, self.constant(dB))
+        return self.guarded(var, 'number', cond)
+
+    def _kw_minLength(self, mL, var, schema):
+        return self.guarded(var, 'string', 'len(%s) >= %s' % (
+            var, self.constant(mL)))
+
+    def _kw_maxLength(self, mL, var, schema):
+        return self.guarded(var, 'string', 'len(%s) <= %s' % (
+            var, self.constant(mL)))
+
+    def _kw_pattern(self, patrn, var, schema):
+        regexp = self.constant(re.compile(patrn), 'R')
+        return self.guarded(var, 'string', '%s.search(%s) is not None' % (
+            regexp, var))
+
+    def _kw_format(self, format, var, schema):
+        if self.validator.format_checker is not None:
+            raise Unsupported('format')
+        return None
+
+    def _kw_minItems(self, mI, var, schema):
+        return self.guarded(var, 'array', 'len(%s) >= %s' % (
+            var, self.constant(mI)))
+
+    def _kw_maxItems(self, mI, var, schema):
+        return self.guarded(var, 'array', 'len(%s) <= %s' % (
+            var, self.constant(mI)))
+
+    def _kw_uniqueItems(self, uI, var, schema):
+        if not uI:
+            return None
+        return self.guarded(var, 'array', '_uniq(%s)' % var)
+
+    def _kw_items(self, items, var, schema):
+        if self.validator.is_type(items, 'object'):
+            body = [
+                'for x in v:',
+                '    if not %s:' % self.expr(items, 'x'),
+                '        return False',
+                'return True',
+            ]
+        else:
+            body = ['n = len(v)']
+            for index, subschema in enumerate(items):
+                body += [
+                    'if n > %d:' % index,
+                    '    x = v[%d]' % index,
+                    '    if not %s:' % self.expr(subschema, 'x'),
+                    '        return False',
+                ]
+            body.append('return True')
+        return self.guarded(var, 'array', '%s(%s)' % (self.helper(body), var))
+
+    def _kw_additionalItems(self, aI, var, schema):
+        if self.validator.is_type(schema.get('items', {}), 'object'):
+            return None
+        len_items = len(schema.get('items', []))
+        if self.validator.is_type(aI, 'object'):
+            body = [
+                'for x in v[%d:]:' % len_items,
+                '    if not %s:' % self.expr(aI, 'x'),
+                '        return False',
+                'return True',
+            ]
+            cond = '%s(%s)' % (self.helper(body), var)
+        elif not aI:
+            cond = 'len(%s) <= %d' % (var, len_items)
+        else:
+            return None
+        return self.guarded(var, 'array', cond)
+
+    def _kw_properties(self, properties, var, schema):
+        body = []
+        for property, subschema in properties.iteritems():
+            key = self.constant(property, 'K')
+            body += [
+                'if %s in v:' % key,
+                '    x = v[%s]' % key,
+                '    if not %s:' % self.expr(subschema, 'x'),
+                '        return False',
+            ]
+        if not body:
+            return None
+        body.append('return True')
+        return self.guarded(var, 'object', '%s(%s)' % (self.helper(body), var))
+
+    def _kw_patternProperties(self, patternProperties, var, schema):
+        body = ['for k, x in v.iteritems():']
+        for pattern, subschema in patternProperties.iteritems():
+            regexp = self.constant(re.compile(pattern), 'R')
+            body += [
+                '    if %s.search(k) and not %s:' % (
+                    regexp, self.expr(subschema, 'x')),
+                '        return False',
+            ]
+        body.append('return True')
+        return self.guarded(var, 'object', '%s(%s)' % (self.helper(body), var))
+
+    def _kw_additionalProperties(self, aP, var, schema):
+        extras = '_find_additional(v, %s)' % self.constant(schema, 'S')
+        if self.validator.is_type(aP, 'object'):
+            body = [
+                'for k in %s:' % extras,
+                '    x = v[k]',
+                '    if not %s:' % self.expr(aP, 'x'),
+                '        return False',
+                'return True',
+            ]
+        elif not aP:
+            body = [
+                'for k in %s:' % extras,
+                '    return False',
+                'return True',
+            ]
+        else:
+            return None
+        return self.guarded(var, 'object', '%s(%s)' % (self.helper(body), var))
+
+    def _kw_required(self, required, var, schema):
+        if not required:
+            return None
+        cond = ' and '.join(
+            '%s in %s' % (self.constant(p, 'K'), var) for p in required)
+        return self.guarded(var, 'object', '(%s)' % cond)
+
+    def _kw_minProperties(self, mP, var, schema):
+        return self.guarded(var, 'object', 'len(%s) >= %s' % (
+            var, self.constant(mP)))
+
+    def _kw_maxProperties(self, mP, var, schema):
+        return self.guarded(var, 'object', 'len(%s) <= %s' % (
+            var, self.constant(mP)))
+
+    def _kw_dependencies(self, dependencies, var, schema):
+        body = []
+        for property, dependency in dependencies.iteritems():
+            key = self.constant(property, 'K')
+            if self.validator.is_type(dependency, 'object'):
+                cond = 'not %s' % self.expr(dependency, 'v')
+            else:
+                cond = ' or '.join(
+                    '%s not in v' % self.constant(d, 'K')
+                    for d in _utils.ensure_list(dependency))
+            if cond:
+                body += [
+                    'if %s in v and (%s):' % (key, cond),
+                    '    return False',
+                ]
+        if not body:
+            return None
+        body.append('return True')
+        return self.guarded(var, 'object', '%s(%s)' % (self.helper(body), var))
@@ -2,19 +2,138 @@
 typeschema.decorators provides function decorators based on typeschema.
 """
 
+import functools
 import inspect
+import random
 
 import typeschema
 
 
-def check_args(schemas, check_function=typeschema.check):
+class Policy(object):
+    """
+    Decides which calls of a decorated function are checked.
+
+    The policy of a decorated function is its ``policy`` attribute, which can
+    be changed at any time. If it is ``None``, the global policy is used (see
+    ``set_policy``).
+    """
+
+    def should_check(self, calls):
+        """
+        Returns whether to check a call, given the number of previous calls
+        to the decorated function.
+        """
+
+        raise NotImplementedError()
+
+
+class _Always(Policy):
+    def should_check(self, calls):
+        return True
+
+    def __repr__(self):
+        return 'ALWAYS'
+
+
+class _Disabled(Policy):
+    def should_check(self, calls):
+        return False
+
+    def __repr__(self):
+        return 'DISABLED'
+
+ALWAYS = _Always()
+DISABLED = _Disabled()
+
+
+class Sampled(Policy):
+    """
+    Checks each call with probability ``rate``.
+    """
+
+    def __init__(self, rate):
+        self.rate = rate
+
+    def should_check(self, calls):
+        return random.random() < self.rate
+
+
+class FirstCalls(Policy):
+    """
+    Checks only the first ``n`` calls of each decorated function.
+    """
+
+    def __init__(self, n):
+        self.n = n
+
+    def should_check(self, calls):
+        return calls < self.n
+
+_policy = ALWAYS
+
+
+def set_policy(policy):
+    """
+    Sets the policy for the decorated functions without one of their own.
+    It is ``ALWAYS`` by default.
+
+    >>> @check_args({'a': {'type': 'integer'}}, policy=FirstCalls(1))
+    ... def f(a):
+    ...     return a
+    >>> @check_args({'a': {'type': 'integer'}})
+    ... def g(a):
+    ...     return a
+    >>> set_policy(DISABLED)
+    >>> g('1')
+    '1'
+    >>> f('1')  # doctest: +ELLIPSIS
+    Traceback (most recent call last):
+        ...
+    ArgValidationError: Value passed to argument 'a' is not valid.
+    ...
+    >>> f('1')
+    '1'
+    >>> set_policy(ALWAYS)
+    """
+
+    global _policy
+    _policy = policy
+
+
+def get_policy():
+    """
+    Returns the policy for the decorated functions without one of their own.
+    """
+
+    return _policy
+
+
+def _should_check(policy, counter):
+    calls = counter[0]
+    counter[0] = calls + 1
+    if policy is None:
+        policy = _policy
+    return policy is ALWAYS or policy.should_check(calls)
+
+
+def check_args(schemas, check_function=typeschema.check, policy=None):
     """
     Decorate a function, checking the schema of its arguments.
 
+    Schemas are compiled when decorating, if ``check_function`` is
+    ``typeschema.check`` or the ``check`` method of a ``typeschema.Checker``.
+
+    Which calls are checked depends on the ``policy`` of the decorated
+    function, see ``Policy``. With ``policy=DISABLED``, the function is
+    returned undecorated, so it can't be enabled later.
+
     Args:
-        schemas: A dictionary <name of the argument>: <JSON schema>.
+        schemas: A dictionary <name of the argument>: <JSON schema>. The
+                 schema for a ``*args`` or ``**kwargs`` argument is checked
+                 against each of the values it collects.
         check_function: A function that takes a value and a JSON schema and
                         throws a ValidationError.
+        policy: The initial ``Policy`` of the decorated function.
 
     Raises:
         typeschema.ValidatonError
@@ -42,53 +161,258 @@ def check_args(schemas, check_function=typeschema.check):
     <BLANKLINE>
     On instance:
         '789'
-    """
 
-    def _check_if_in_schemas(arg_name, value):
-        if arg_name in schemas:
-            try:
-                check_function(value, schemas[arg_name])
-            except typeschema.ValidationError as e:
-                raise ArgValidationError(arg_name, e)
+    >>> @check_args({'numbers': {'type': 'number'}})
+    ... def add(*numbers):
+    ...     return sum(numbers)
+    >>> add(1, 2, 3)
+    6
+    >>> add(1, '2')
+    Traceback (most recent call last):
+        ...
+    ArgValidationError: Value passed to argument 'numbers' is not valid.
+    '2' is not of type 'number'
+    <BLANKLINE>
+    Failed validating 'type' in schema:
+        {'type': 'number'}
+    <BLANKLINE>
+    On instance:
+        '2'
+    """
 
     def check_wrapped(wrapped):
-        arg_names = inspect.getargspec(wrapped)
+        if policy is DISABLED:
+            return wrapped
+
+        spec = _getargspec(wrapped)
 
         # Check if every arg in the schema corresponds to an actual arg in the
         # function.
         for arg_name in schemas:
-            if arg_name not in arg_names.args:
+            if arg_name not in spec.args and \
+                    arg_name not in (spec.varargs, spec.keywords):
                 raise Exception("defined schema for inexistent argument: " +
                                 arg_name)
 
+        validators = dict(
+            (arg_name, typeschema._compile_check(check_function, schema))
+            for arg_name, schema in schemas.iteritems()
+        )
+
         # Check the types of the default values of the function.
-        if arg_names.defaults:
-            defaulted_args = arg_names.args[-len(arg_names.defaults):]
-            i = 0
-            while i < len(defaulted_args):
-                arg_name, def_value = defaulted_args[i], arg_names.defaults[i]
-                _check_if_in_schemas(arg_name, def_value)
-                i += 1
+        if spec.defaults:
+            defaulted_args = spec.args[-len(spec.defaults):]
+            for arg_name, def_value in zip(defaulted_args, spec.defaults):
+                if arg_name in validators:
+                    _validate(validators[arg_name], arg_name, def_value)
+
+        # Which validator to use for each position and for each keyword is
+        # resolved here, so that calls only have to run them.
+        positional = [
+            (index, arg_name, validators[arg_name])
+            for index, arg_name in enumerate(spec.args)
+            if arg_name in validators
+        ]
+        max_positional = len(spec.args)
+        varargs = validators.get(spec.varargs)
+        by_keyword = dict(
+            (arg_name, validators[arg_name])
+            for arg_name in spec.args if arg_name in validators
+        )
+        keywords = validators.get(spec.keywords)
+        if keywords is not None:
+            for arg_name in spec.args:
+                by_keyword.setdefault(arg_name, None)
 
+        if not validators:
+            return wrapped
+
+        counter = [0]
+
+        @functools.wraps(wrapped)
         def call(*args, **kwargs):
-            # Check positional arguments.
-            i = 0
-            while i < len(args):
-                arg_name, value_passed = arg_names.args[i], args[i]
-                _check_if_in_schemas(arg_name, value_passed)
-                i += 1
-            # Check named arguments.
-            for arg_name, value_passed in kwargs.items():
-                _check_if_in_schemas(arg_name, value_passed)
+            if not _should_check(call.policy, counter):
+                return wrapped(*args, **kwargs)
+
+            arg_name = None
+            try:
+                # Check positional arguments.
+                n_args = len(args)
+                for index, arg_name, validate in positional:
+                    if index >= n_args:
+                        break
+                    validate(args[index])
+                if varargs is not None and n_args > max_positional:
+                    arg_name = spec.varargs
+                    for value in args[max_positional:]:
+                        varargs(value)
+                # Check named arguments.
+                if kwargs:
+                    for arg_name, value in kwargs.iteritems():
+                        validate = by_keyword.get(arg_name, keywords)
+                        if validate is not None:
+                            validate(value)
+            except typeschema.ValidationError as e:
+                raise ArgValidationError(arg_name, e)
 
             return wrapped(*args, **kwargs)
 
-        return call
+        return _finish(call, wrapped, policy)
+    return check_wrapped
+
+
+def check_returns(schema, check_function=typeschema.check, policy=None):
+    """
+    Decorate a function, checking the schema of the value it returns.
+
+    Args:
+        schema: A JSON schema.
+        check_function: As in ``check_args``.
+        policy: As in ``check_args``.
+
+    Raises:
+        ReturnValidationError
+
+    >>> @check_returns({'type': 'integer'})
+    ... def half(n):
+    ...     return n / 2
+    >>> half(4)
+    2
+    >>> half(5.0)
+    Traceback (most recent call last):
+        ...
+    ReturnValidationError: Value returned is not valid.
+    2.5 is not of type 'integer'
+    <BLANKLINE>
+    Failed validating 'type' in schema:
+        {'type': 'integer'}
+    <BLANKLINE>
+    On instance:
+        2.5
+    """
+
+    def check_wrapped(wrapped):
+        if policy is DISABLED:
+            return wrapped
+
+        validate = typeschema._compile_check(check_function, schema)
+        counter = [0]
+
+        @functools.wraps(wrapped)
+        def call(*args, **kwargs):
+            value = wrapped(*args, **kwargs)
+            if _should_check(call.policy, counter):
+                try:
+                    validate(value)
+                except typeschema.ValidationError as e:
+                    raise ReturnValidationError(e)
+            return value
+
+        return _finish(call, wrapped, policy)
+    return check_wrapped
+
+
+def check_yields(schema, check_function=typeschema.check, policy=None):
+    """
+    Decorate a function returning an iterable, like a generator, checking
+    the schema of each item as it is consumed. Items are not buffered.
+
+    The policy decides whether to check all the items of an iterable or
+    none of them. The decorated function returns a plain iterator, so
+    ``send`` and ``throw`` are not available.
+
+    Args:
+        schema: A JSON schema for the items.
+        check_function: As in ``check_args``.
+        policy: As in ``check_args``.
+
+    Raises:
+        YieldValidationError
+
+    >>> @check_yields({'type': 'integer'})
+    ... def numbers():
+    ...     yield 1
+    ...     yield 'two'
+    >>> items = numbers()
+    >>> next(items)
+    1
+    >>> next(items)
+    Traceback (most recent call last):
+        ...
+    YieldValidationError: Value yielded at index 1 is not valid.
+    'two' is not of type 'integer'
+    <BLANKLINE>
+    Failed validating 'type' in schema:
+        {'type': 'integer'}
+    <BLANKLINE>
+    On instance:
+        'two'
+    """
+
+    def check_wrapped(wrapped):
+        if policy is DISABLED:
+            return wrapped
+
+        validate = typeschema._compile_check(check_function, schema)
+        counter = [0]
+
+        @functools.wraps(wrapped)
+        def call(*args, **kwargs):
+            iterable = wrapped(*args, **kwargs)
+            if not _should_check(call.policy, counter):
+                return iterable
+            return _check_items(iterable, validate)
+
+        return _finish(call, wrapped, policy)
     return check_wrapped
 
 
+def _check_items(iterable, validate):
+    for index, value in enumerate(iterable):
+        try:
+            validate(value)
+        except typeschema.ValidationError as e:
+            raise YieldValidationError(index, e)
+        yield value
+
+
+def _finish(call, wrapped, policy):
+    call.__wrapped__ = wrapped
+    call.policy = policy
+    return call
+
+
+def _getargspec(function):
+    # Look through other decorators from this module.
+    while hasattr(function, '__wrapped__'):
+        function = function.__wrapped__
+    return inspect.getargspec(function)
+
+
+def _validate(validate, arg_name, value):
+    try:
+        validate(value)
+    except typeschema.ValidationError as e:
+        raise ArgValidationError(arg_name, e)
+
+
 class ArgValidationError(Exception):
     def __init__(self, arg_name, cause):
         msg = "Value passed to argument '%s' is not valid.\n%s"
         super(ArgValidationError, self).__init__(msg % (arg_name, cause))
         self.cause = cause
+
+
+class ReturnValidationError(Exception):
+    def __init__(self, cause):
+        msg = "Value returned is not valid.\n%s"
+        super(ReturnValidationError, self).__init__(msg % cause)
+        self.cause = cause
+
+
+class YieldValidationError(Exception):
+    def __init__(self, index, cause):
+        msg = "Value yielded at index %d is not valid.\n%s"
+        super(YieldValidationError, self).__init__(msg % (index, cause))
+        self.index = index
+        self.cause = cause
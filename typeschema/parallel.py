@@ -0,0 +1,117 @@
+"""
+typeschema.parallel spreads the validation of many values across a pool of
+processes, for CPU-bound validation of big batches.
+
+The checker and the schema are sent to each worker process once, so the
+checker must be picklable (see ``typeschema.Checker``), and so must be the
+values.
+
+>>> errors = check_parallel([1, 'a', 2], {'type': 'integer'}, workers=2)
+>>> [str(e).splitlines()[0] if e else e for e in errors]
+[None, "'a' is not of type 'integer'", None]
+"""
+
+import itertools
+import multiprocessing
+
+import typeschema
+from typeschema import COLLECT_ALL, FAIL_FAST, INVALID_INDICES
+
+
+def check_parallel(values, schema, checker=typeschema.checker, workers=None,
+                   chunksize=1000, mode=COLLECT_ALL):
+    """
+    Checks every value of an iterable against a schema using a process pool.
+
+    Values are sent to the workers in chunks of ``chunksize``, and results
+    keep the order of the input.
+
+    Args:
+        values: An iterable of values.
+        schema: A JSON schema.
+        checker: The ``typeschema.Checker`` to use.
+        workers: Number of processes. Defaults to the number of CPUs.
+        chunksize: Number of values sent to a worker at once.
+        mode: As in ``typeschema.Checker.check_many``.
+
+    >>> check_parallel(range(10) + ['a'], {'type': 'integer'},
+    ...                workers=2, chunksize=3, mode=INVALID_INDICES)
+    [10]
+    """
+
+    if mode not in (FAIL_FAST, COLLECT_ALL, INVALID_INDICES):
+        raise ValueError('unknown mode: %r' % (mode,))
+
+    compiled = checker.compile(schema)
+    pool = multiprocessing.Pool(workers, _init_worker, (compiled, mode))
+    try:
+        results = []
+        for start, result in pool.imap(_check_chunk,
+                                       _chunks(values, chunksize)):
+            if mode == INVALID_INDICES:
+                results.extend(start + index for index in result)
+            elif mode == COLLECT_ALL:
+                results.extend(
+                    _load_error(error) if error else None for error in result)
+            elif result is not None:
+                raise _load_error(result)
+    finally:
+        pool.terminate()
+        pool.join()
+
+    if mode != FAIL_FAST:
+        return results
+
+
+def _chunks(values, size):
+    values = iter(values)
+    start = 0
+    while True:
+        chunk = list(itertools.islice(values, size))
+        if not chunk:
+            return
+        yield start, chunk
+        start += len(chunk)
+
+
+# Set in each worker process by _init_worker.
+_compiled = None
+_mode = None
+
+
+def _init_worker(compiled, mode):
+    global _compiled, _mode
+    _compiled = compiled
+    _mode = mode
+
+
+def _check_chunk(args):
+    start, chunk = args
+    if _mode == FAIL_FAST:
+        try:
+            _compiled.check_many(chunk, FAIL_FAST)
+        except typeschema.ValidationError as e:
+            e.path[0] += start
+            return start, _dump_error(e)
+        return start, None
+
+    result = _compiled.check_many(chunk, _mode)
+    if _mode == COLLECT_ALL:
+        result = [_dump_error(e) if e else None for e in result]
+    return start, result
+
+
+# ValidationErrors can't be pickled, so they travel as dicts.
+
+def _dump_error(error):
+    contents = error._contents()
+    del contents['parent']
+    contents['cause'] = None
+    contents['context'] = [_dump_error(e) for e in error.context]
+    return contents
+
+
+def _load_error(contents):
+    contents = dict(contents)
+    contents['context'] = [_load_error(e) for e in contents['context']]
+    return typeschema.ValidationError(**contents)
@@ -4,10 +4,15 @@ properties of a class.
 """
 
 import typeschema
+import typeschema._cache
 import copy
+import copy_reg
+import sys
 
 _builtin_property = property
 _builtin_float = float
+_builtin_list = list
+_builtin_dict = dict
 
 
 class property(_builtin_property):
@@ -17,11 +22,16 @@ class property(_builtin_property):
 
     Args:
         name: Name of the property. The value of the property will be set in
-            the object's ``__dict__`` with the name as key.
+            the object's ``__dict__`` with the name as key, or in a slot if
+            the class is a ``Model``.
         schema: A JSON schema as defined in ``typeschema``.
-        default: A value It will be copied with ``copy.deepcopy``, so that
-            different instances of the class don't share this value.
+        default: A value for objects where the property hasn't been set.
+            Immutable values are shared, and mutable ones are copied the
+            first time they are read, so that different instances of the
+            class don't share this value.
         check: A ``typeschema.Checker``.
+        default_factory: A function called without arguments to make the
+            default value of each object, instead of ``default``.
 
     Returns:
         A ``property`` object.
@@ -46,39 +56,348 @@ class property(_builtin_property):
     >>> MyClass.my_attr.schema
     {'type': 'integer'}
     """
-    def __init__(self, name, schema, default=None, check=typeschema.check):
+    def __init__(self, name, schema, default=None, check=typeschema.check,
+                 default_factory=None):
         self.name = name
         self.schema = schema
         self.default = default
         self.check = check
+        self.slot = None
+        self.mark = None
         if default is not None:
+            if default_factory is not None:
+                raise ValueError(
+                    "default and default_factory can't be used together")
             check(default, schema)
+            if self._coerce is not None:
+                self.default = self._coerce(default)
+            elif self._convert is not None:
+                self.default = self._convert(default)
+        if default_factory is not None:
+            check(default_factory(), schema)
+            self._make_default = default_factory
+            convert = self._coerce or self._convert
+            if convert is not None:
+                # Made defaults are converted like any value that is set.
+                self._make_default = lambda: convert(default_factory())
+        else:
+            self._make_default = _copier(self.default)
 
         super(property, self).__init__(self._get_getter(), self._get_setter())
 
-    def _get_getter(self):
+    # Functions (value) -> value that subclasses can define to transform
+    # values before they are checked, and after they pass the check and
+    # before they are stored.
+    _adapt = None
+    _convert = None
+
+    # A function (value) -> value that subclasses can define to check and
+    # convert values in a single step, instead of the check and _convert. It
+    # must raise ValidationError for invalid values.
+    _coerce = None
+
+    def _coerce_failed(self, value):
+        """
+        Called by ``_coerce`` from the ``except`` block of an error
+        converting a value: raises the ``ValidationError`` that the check
+        gives for the value, or else the error being handled.
+        """
+
+        exc_info = sys.exc_info()
+        self.check(value, self.schema)
+        raise exc_info[0], exc_info[1], exc_info[2]
+
+    def _slotted(self, slot, mark=None):
+        """
+        Returns a copy of the property that keeps its value in ``slot``, a
+        member descriptor of a class with ``__slots__``, instead of in the
+        object's ``__dict__``. The slot must be set before it's read.
+
+        If ``mark`` is given, the setter doesn't check values, but calls
+        ``mark`` with the object so that they are checked later.
+        """
+
+        other = copy.copy(self)
+        other.slot = slot
+        other.mark = mark
+        _builtin_property.__init__(
+            other, other._get_getter(), other._get_setter())
+        return other
+
+    def _load(self):
+        """
+        Returns a function that takes an object and returns the value stored
+        in it.
+        """
+
+        make_default = self._make_default
+        if self.slot is not None:
+            if make_default is None:
+                return self.slot.__get__
+            get_slot, set_slot = self.slot.__get__, self.slot.__set__
+
+            def load(self):
+                value = get_slot(self)
+                if value is _unset:
+                    value = make_default()
+                    set_slot(self, value)
+                return value
+
+            return load
+
         name = self.name
         default = self.default
 
-        def getter(self):
-            if default is not None and not name in self.__dict__:
-                self.__dict__[name] = copy.deepcopy(default)
-            return self.__dict__.get(name, default)
-
-        return getter
+        if make_default is None:
+            def load(self):
+                return self.__dict__.get(name, default)
+        else:
+            def load(self):
+                if not name in self.__dict__:
+                    self.__dict__[name] = make_default()
+                return self.__dict__[name]
+
+        return load
+
+    def _pending(self):
+        """
+        Returns a function that takes an object and tells whether its value
+        was set without being checked yet, as with ``deferred_validation``,
+        or None if values are always checked when set.
+        """
+
+        if self.mark is None:
+            return None
+        return self.mark.pending
+
+    def _store(self):
+        """
+        Returns a function that takes an object and a value and stores the
+        value in it.
+        """
+
+        if self.slot is not None:
+            return self.slot.__set__
 
-    def _get_setter(self):
-        schema = self.schema
         name = self.name
-        check = self.check
 
-        def setter(self, value):
-            check(value, schema)
+        def store(self, value):
             self.__dict__[name] = value
 
+        return store
+
+    def _get_getter(self):
+        return self._load()
+
+    def _get_setter(self):
+        validate = typeschema.typeschema._compile_check(
+            self.check, self.schema)
+        store = self._store()
+        adapt = self._adapt
+        convert = self._convert
+        coerce = self._coerce
+        mark = self.mark
+
+        if mark is not None:
+            def setter(self, value):
+                if adapt is not None:
+                    value = adapt(value)
+                store(self, value)
+                mark(self)
+        elif coerce is not None:
+            def setter(self, value):
+                if adapt is not None:
+                    value = adapt(value)
+                store(self, coerce(value))
+        else:
+            def setter(self, value):
+                if adapt is not None:
+                    value = adapt(value)
+                validate(value)
+                if convert is not None:
+                    value = convert(value)
+                store(self, value)
+
         return setter
 
 
+def _check_item(validate, key, value):
+    try:
+        validate(value)
+    except typeschema.ValidationError as e:
+        e.path.appendleft(key)
+        raise
+
+
+class ValidatedList(_builtin_list):
+    """
+    A list that checks its items as they are added or replaced, so that the
+    cost of a change doesn't depend on the size of the list. Errors have the
+    index of the item in their path.
+
+    Args:
+        validate_item: A function that raises ``ValidationError`` for
+            invalid items, like a ``typeschema.CompiledSchema``.
+        iterable: The initial items.
+
+    >>> integer = typeschema.checker.compile({'type': 'integer'})
+    >>> numbers = ValidatedList(integer)
+    >>> numbers.extend([1, 2])
+    >>> numbers[1:] = [3, None]
+    Traceback (most recent call last):
+        ...
+    ValidationError: None is not of type 'integer'
+    <BLANKLINE>
+    Failed validating 'type' in schema:
+        {'type': 'integer'}
+    <BLANKLINE>
+    On instance[2]:
+        None
+    >>> numbers
+    [1, 2]
+    """
+
+    __slots__ = ('validate_item',)
+
+    def __init__(self, validate_item, iterable=(), _checked=False):
+        self.validate_item = validate_item
+        if not _checked:
+            iterable = self._checked(0, iterable)
+        _builtin_list.__init__(self, iterable)
+
+    def _checked(self, start, values):
+        values = _builtin_list(values)
+        validate = self.validate_item
+        for index, value in enumerate(values):
+            _check_item(validate, start + index, value)
+        return values
+
+    def __reduce__(self):
+        return ValidatedList, (self.validate_item, _builtin_list(self), True)
+
+    def __copy__(self):
+        return ValidatedList(self.validate_item, self, _checked=True)
+
+    def __deepcopy__(self, memo):
+        return ValidatedList(
+            self.validate_item, copy.deepcopy(_builtin_list(self), memo),
+            _checked=True)
+
+    def append(self, value):
+        _check_item(self.validate_item, len(self), value)
+        _builtin_list.append(self, value)
+
+    def extend(self, values):
+        _builtin_list.extend(self, self._checked(len(self), values))
+
+    def __iadd__(self, values):
+        self.extend(values)
+        return self
+
+    def insert(self, index, value):
+        _check_item(self.validate_item, index, value)
+        _builtin_list.insert(self, index, value)
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            value = self._checked(index.indices(len(self))[0], value)
+        else:
+            _check_item(self.validate_item, index, value)
+        _builtin_list.__setitem__(self, index, value)
+
+    def __setslice__(self, start, stop, values):
+        self.__setitem__(slice(start, stop), values)
+
+
+class ValidatedDict(_builtin_dict):
+    """
+    A dict that checks its values as they are set. Errors have the key of
+    the value in their path.
+
+    Args:
+        validate_value: A function that raises ``ValidationError`` for
+            invalid values, like a ``typeschema.CompiledSchema``.
+        mapping: The initial items.
+    """
+
+    __slots__ = ('validate_value',)
+
+    def __init__(self, validate_value, mapping=(), _checked=False):
+        self.validate_value = validate_value
+        if not _checked:
+            mapping = self._checked(mapping)
+        _builtin_dict.__init__(self, mapping)
+
+    def _checked(self, *args, **kwargs):
+        values = _builtin_dict(*args, **kwargs)
+        validate = self.validate_value
+        for key, value in values.iteritems():
+            _check_item(validate, key, value)
+        return values
+
+    def __reduce__(self):
+        return ValidatedDict, (self.validate_value, _builtin_dict(self), True)
+
+    def __copy__(self):
+        return ValidatedDict(self.validate_value, self, _checked=True)
+
+    def __deepcopy__(self, memo):
+        return ValidatedDict(
+            self.validate_value, copy.deepcopy(_builtin_dict(self), memo),
+            _checked=True)
+
+    def __setitem__(self, key, value):
+        _check_item(self.validate_value, key, value)
+        _builtin_dict.__setitem__(self, key, value)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        _builtin_dict.update(self, self._checked(*args, **kwargs))
+
+
+# Stored in the slots of a Model whose default hasn't been made yet.
+_unset = object()
+
+
+def _is_immutable(value):
+    if value.__class__ in typeschema._cache._IMMUTABLES:
+        return True
+    if isinstance(value, (tuple, frozenset)):
+        return all(_is_immutable(item) for item in value)
+    return False
+
+
+def _copier(value):
+    """
+    Returns a function that makes a copy of value, or None if the value is
+    immutable and can be shared. Lists, dicts and sets are copied shallowly
+    when their contents are immutable.
+
+    >>> print _copier((1, 'a'))
+    None
+    >>> _copier([1, 'a'])()
+    [1, 'a']
+    >>> value = [[]]
+    >>> _copier(value)()[0] is value[0]
+    False
+    """
+
+    if _is_immutable(value):
+        return None
+    cls = value.__class__
+    if cls in (_builtin_list, _builtin_dict, set, ValidatedList,
+               ValidatedDict):
+        items = value.itervalues() if isinstance(value, _builtin_dict) \
+            else value
+        if all(_is_immutable(item) for item in items):
+            return lambda: copy.copy(value)
+    return lambda: copy.deepcopy(value)
+
+
 class nullable(property):
     """
     Defines a nullable property for a class whose setter checks that the input
@@ -103,11 +422,12 @@ class nullable(property):
     On instance:
         '123'
     """
-    def __init__(self, name, internal_type, default=None, check=typeschema.check):
+    def __init__(self, name, internal_type, default=None, check=typeschema.check,
+                 default_factory=None):
         super(nullable, self).__init__(name, {'anyOf': [
             {'type': internal_type},
             {'type': 'null'}
-        ]}, default=default, check=check)
+        ]}, default=default, check=check, default_factory=default_factory)
 
 
 class int(nullable):
@@ -162,17 +482,10 @@ class float(nullable):
     def __init__(self, name, default=None):
         super(float, self).__init__(name, 'number', default=default)
 
-    def _get_setter(self):
-        parent_setter = super(float, self)._get_setter()
-        name = self.name
-
-        def setter(self, value):
-            # call the parent, let them do the checks
-            # cast to float if the check is passed
-            parent_setter(self, value)
-            self.__dict__[name] = _builtin_float(self.__dict__[name])
-
-        return setter
+    def _convert(self, value):
+        if value is None:
+            return None
+        return _builtin_float(value)
 
 
 class string(nullable):
@@ -230,6 +543,10 @@ class list(nullable):
     Defines a property for a class whose setter checks that the input is a
     list or None.
 
+    If ``items`` is given, the items must comply with it, and the getter
+    returns a ``ValidatedList`` that checks the items added later. Assigning
+    it to a property with the same ``items`` doesn't check it again.
+
     >>> class MyClass(object):
     ...     my_attr = list('my_attr', default=[])
     >>> my = MyClass()
@@ -249,9 +566,102 @@ class list(nullable):
     <BLANKLINE>
     On instance:
         '123'
+    >>> class MyClass(object):
+    ...     my_attr = list('my_attr', items={'type': 'integer'})
+    >>> my = MyClass()
+    >>> my.my_attr = [1, 2]
+    >>> my.my_attr.append('3')
+    Traceback (most recent call last):
+        ...
+    ValidationError: '3' is not of type 'integer'
+    <BLANKLINE>
+    Failed validating 'type' in schema:
+        {'type': 'integer'}
+    <BLANKLINE>
+    On instance[2]:
+        '3'
     """
-    def __init__(self, name, default=None):
-        super(list, self).__init__(name, 'array', default=default)
+    def __init__(self, name, default=None, default_factory=None, items=None):
+        self.items = items
+        if items is None:
+            super(list, self).__init__(name, 'array', default=default,
+                                       default_factory=default_factory)
+            return
+
+        self._validate_item = typeschema.typeschema._compile_check(
+            typeschema.check, items)
+        property.__init__(self, name, {'anyOf': [
+            {'type': 'array', 'items': items},
+            {'type': 'null'}
+        ]}, default=default, default_factory=default_factory)
+
+    def _convert(self, value):
+        if self.items is None or value is None:
+            return value
+        return ValidatedList(self._validate_item, value, _checked=True)
+
+    def _get_setter(self):
+        setter = super(list, self)._get_setter()
+        if self.items is None or self.mark is not None:
+            return setter
+
+        validate_item = self._validate_item
+        store = self._store()
+
+        def list_setter(self, value):
+            if value.__class__ is ValidatedList and \
+                    value.validate_item is validate_item:
+                store(self, value)
+            else:
+                setter(self, value)
+
+        return list_setter
+
+
+class dict(nullable):
+    """
+    Defines a property for a class whose setter checks that the input is a
+    dict or None.
+
+    If ``values`` is given, the values must comply with it, and the getter
+    returns a ``ValidatedDict`` that checks the values set later.
+
+    >>> class MyClass(object):
+    ...     my_attr = dict('my_attr', values={'type': 'integer'})
+    >>> my = MyClass()
+    >>> my.my_attr = {'a': 1}
+    >>> my.my_attr['b'] = 2
+    >>> sorted(my.my_attr.items())
+    [('a', 1), ('b', 2)]
+    >>> my.my_attr['c'] = '3'
+    Traceback (most recent call last):
+        ...
+    ValidationError: '3' is not of type 'integer'
+    <BLANKLINE>
+    Failed validating 'type' in schema:
+        {'type': 'integer'}
+    <BLANKLINE>
+    On instance['c']:
+        '3'
+    """
+    def __init__(self, name, default=None, default_factory=None, values=None):
+        self.values = values
+        if values is None:
+            super(dict, self).__init__(name, 'object', default=default,
+                                       default_factory=default_factory)
+            return
+
+        self._validate_value = typeschema.typeschema._compile_check(
+            typeschema.check, values)
+        property.__init__(self, name, {'anyOf': [
+            {'type': 'object', 'additionalProperties': values},
+            {'type': 'null'}
+        ]}, default=default, default_factory=default_factory)
+
+    def _convert(self, value):
+        if self.values is None or value is None:
+            return value
+        return ValidatedDict(self._validate_value, value, _checked=True)
 
 
 class enum(property):
@@ -284,3 +694,294 @@ class enum(property):
             {'enum': values},
             {'type': 'null'}
         ]}, default=default)
+
+
+class _ModelMeta(type):
+    """
+    Gives a slot to every property declared in the body of a class, and
+    replaces the property with a copy that keeps its value there.
+    """
+
+    def __new__(mcs, name, bases, namespace):
+        namespace = _builtin_dict(namespace)
+        declared = sorted(
+            (attr, value) for attr, value in namespace.iteritems()
+            if isinstance(value, property))
+
+        slots = namespace.get('__slots__', ())
+        if isinstance(slots, basestring):
+            slots = (slots,)
+        namespace['__slots__'] = tuple(slots) + tuple(
+            _slot_name(attr) for attr, _ in declared)
+
+        cls = super(_ModelMeta, mcs).__new__(mcs, name, bases, namespace)
+        deferred = cls.deferred_validation
+
+        properties = {}
+        for base in reversed(cls.__mro__[1:]):
+            properties.update(getattr(base, '_properties', {}))
+        # Inherited properties are copied again if the mode changed.
+        rebound = [
+            (attr, prop, prop.slot) for attr, prop in properties.iteritems()
+            if (prop.mark is not None) != deferred
+        ] + [
+            (attr, prop, cls.__dict__[_slot_name(attr)])
+            for attr, prop in declared
+        ]
+        for attr, prop, slot in rebound:
+            mark = _marker(attr, cls._typeschema_dirty) if deferred else None
+            prop = prop._slotted(slot, mark)
+            setattr(cls, attr, prop)
+            properties[attr] = prop
+        cls._properties = properties
+        cls._validators = _validators(properties)
+        cls._initial = [(cls._typeschema_dirty.__set__, None)] + [
+            (prop.slot.__set__,
+             prop.default if prop._make_default is None else _unset)
+            for prop in properties.itervalues()
+        ]
+
+        return cls
+
+
+def _validators(properties):
+    """
+    Returns functions that check a dictionary of values for some of the
+    properties, one for each checker used by them.
+    """
+
+    schemas = {}
+    for attr, prop in properties.iteritems():
+        if prop._coerce is None:
+            schemas.setdefault(prop.check, {})[attr] = prop.schema
+    return [
+        typeschema.typeschema._compile_check(check, {'properties': schemas})
+        for check, schemas in schemas.iteritems()
+    ]
+
+
+def _check_values(cls, values):
+    """
+    Checks and converts, in place, a dictionary of values for properties of
+    a Model.
+    """
+
+    for validate in cls._validators:
+        validate(values)
+
+    properties = cls._properties
+    for attr, value in values.iteritems():
+        prop = properties[attr]
+        if prop._coerce is not None:
+            try:
+                values[attr] = prop._coerce(value)
+            except typeschema.ValidationError as e:
+                e.path.appendleft(attr)
+                raise
+        elif prop._convert is not None:
+            values[attr] = prop._convert(value)
+
+
+def _slot_name(attr):
+    # Slots of Model itself start with '_typeschema_' instead, so that no
+    # property can take them.
+    return '_ts_' + attr
+
+
+def _marker(attr, dirty_slot):
+    """
+    Returns a function that adds attr to the dirty properties of a Model,
+    kept in a set that only exists while some property is dirty.
+    """
+
+    get_dirty, set_dirty = dirty_slot.__get__, dirty_slot.__set__
+
+    def mark(obj):
+        dirty = get_dirty(obj)
+        if dirty is None:
+            set_dirty(obj, set([attr]))
+        else:
+            dirty.add(attr)
+
+    def pending(obj):
+        dirty = get_dirty(obj)
+        return dirty is not None and attr in dirty
+
+    mark.pending = pending
+    return mark
+
+
+class Model(object):
+    """
+    Base class for classes whose attributes are all properties.
+
+    The values of the properties are kept in ``__slots__`` instead of in a
+    ``__dict__``, which makes instances smaller and reading attributes
+    faster. Properties are checked the same way as in any other class, and
+    can be given as keyword arguments to the constructor, which sets them
+    like ``update``. Other attributes need their own ``__slots__``.
+
+    Classes with ``deferred_validation`` set to ``True`` don't check values
+    when they are set, which is meant for objects built from trusted data.
+    Instead, the properties that were set are remembered, and checked and
+    converted all at once by ``validate``, which is also called before the
+    object is pickled. Until then, they return values as they were set.
+
+    >>> class Point(Model):
+    ...     x = int('x', default=0)
+    ...     y = int('y', default=0)
+    >>> point = Point(y=2)
+    >>> point.x, point.y
+    (0, 2)
+    >>> point.x = 'a'
+    Traceback (most recent call last):
+        ...
+    ValidationError: 'a' is not valid under any of the given schemas
+    <BLANKLINE>
+    Failed validating 'anyOf' in schema:
+        {'anyOf': [{'type': 'integer'}, {'type': 'null'}]}
+    <BLANKLINE>
+    On instance:
+        'a'
+    >>> point.z = 3
+    Traceback (most recent call last):
+        ...
+    AttributeError: 'Point' object has no attribute 'z'
+    """
+
+    __metaclass__ = _ModelMeta
+    __slots__ = ('_typeschema_dirty',)
+
+    deferred_validation = False
+
+    def __new__(cls, *args, **kwargs):
+        self = super(Model, cls).__new__(cls)
+        for set_slot, value in cls._initial:
+            set_slot(self, value)
+        return self
+
+    def __init__(self, **fields):
+        if fields:
+            self.update(**fields)
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Creates an instance with the values of a dictionary, set like
+        ``update`` does. ``__init__`` is not called.
+
+        >>> class Point(Model):
+        ...     x = int('x')
+        ...     y = float('y')
+        >>> point = Point.from_dict({'x': 1, 'y': 2})
+        >>> point.x, point.y
+        (1, 2.0)
+        """
+
+        self = cls.__new__(cls)
+        self.update(**data)
+        return self
+
+    def update(self, **fields):
+        """
+        Sets the values of some properties at once.
+
+        All the values are checked in a single pass, with one schema per
+        checker used by the properties, and nothing is set unless all of them
+        are valid. The path of the error tells which property was invalid.
+
+        >>> class Point(Model):
+        ...     x = int('x', default=0)
+        ...     y = int('y', default=0)
+        >>> point = Point()
+        >>> point.update(x=1, y='a')
+        Traceback (most recent call last):
+            ...
+        ValidationError: 'a' is not valid under any of the given schemas
+        <BLANKLINE>
+        Failed validating 'anyOf' in schema['properties']['y']:
+            {'anyOf': [{'type': 'integer'}, {'type': 'null'}]}
+        <BLANKLINE>
+        On instance['y']:
+            'a'
+        >>> point.x
+        0
+        """
+
+        cls = type(self)
+        properties = cls._properties
+        for attr, value in fields.iteritems():
+            prop = properties.get(attr)
+            if prop is None:
+                raise AttributeError("'%s' object has no attribute '%s'" % (
+                    cls.__name__, attr))
+            if prop._adapt is not None:
+                fields[attr] = prop._adapt(value)
+
+        _check_values(cls, fields)
+        for attr, value in fields.iteritems():
+            properties[attr].slot.__set__(self, value)
+
+        dirty = self._typeschema_dirty
+        if dirty is not None:
+            dirty.difference_update(fields)
+
+    def validate(self):
+        """
+        Checks and converts the values of the properties set since the last
+        call, if the class has ``deferred_validation``. If some value isn't
+        valid, they are all left as they were set.
+
+        >>> class Point(Model):
+        ...     deferred_validation = True
+        ...     x = float('x')
+        >>> point = Point()
+        >>> point.x = 'a'
+        >>> point.validate()
+        Traceback (most recent call last):
+            ...
+        ValidationError: 'a' is not valid under any of the given schemas
+        <BLANKLINE>
+        Failed validating 'anyOf' in schema['properties']['x']:
+            {'anyOf': [{'type': 'number'}, {'type': 'null'}]}
+        <BLANKLINE>
+        On instance['x']:
+            'a'
+        >>> point.x = 1
+        >>> point.validate()
+        >>> point.x
+        1.0
+        """
+
+        dirty = self._typeschema_dirty
+        if dirty is None:
+            return
+
+        properties = self._properties
+        values = _builtin_dict(
+            (attr, properties[attr].slot.__get__(self)) for attr in dirty)
+        _check_values(type(self), values)
+        for attr, value in values.iteritems():
+            properties[attr].slot.__set__(self, value)
+        self._typeschema_dirty = None
+
+    def __reduce__(self):
+        # Like protocol 2 does, so that __new__ is called with any protocol.
+        return copy_reg.__newobj__, (type(self),), self.__getstate__()
+
+    def __getstate__(self):
+        self.validate()
+        state = {}
+        for attr, prop in self._properties.iteritems():
+            value = prop.slot.__get__(self)
+            # Defaults not made yet are left for __setstate__ to reset.
+            if value is not _unset:
+                state[attr] = value
+        return state
+
+    def __setstate__(self, state):
+        # Unpickling with protocols below 2 doesn't call __new__.
+        for set_slot, value in type(self)._initial:
+            set_slot(self, value)
+        for attr, value in state.iteritems():
+            self._properties[attr].slot.__set__(self, value)
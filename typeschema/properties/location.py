@@ -1,8 +1,8 @@
-import incf.countryutils.datatypes as datatypes
+import sys
 
 import typeschema.properties
 import typeschema.types.location
-from typeschema.types.location import City, types
+from typeschema.types.location import City, find_country, types
 
 _checker = typeschema.Checker()
 _checker.extend(types)
@@ -47,28 +47,23 @@ class country(typeschema.properties.nullable):
         )
 
     def _get_getter(self):
-        name = self.name
-        default = self.default
+        load = self._load()
 
         def getter(self):
-            country = self.__dict__.get(name, default)
+            country = load(self)
             if not country:
                 return None
 
-            return datatypes.Country(country)
+            return find_country(country)
 
         return getter
 
-    def _get_setter(self):
-        parent_setter = super(country, self)._get_setter()
-
-        def setter(self, value):
-            if isinstance(value, datatypes.Country):
-                value = value.name
-
-            parent_setter(self, value)
-
-        return setter
+    def _adapt(self, value):
+        # There can't be a Country unless incf.countryutils has been imported.
+        datatypes = sys.modules.get('incf.countryutils.datatypes')
+        if datatypes is not None and isinstance(value, datatypes.Country):
+            return value.name
+        return value
 
 
 class city(typeschema.properties.nullable):
@@ -108,11 +103,10 @@ class city(typeschema.properties.nullable):
         )
 
     def _get_getter(self):
-        name = self.name
-        default = self.default
+        load = self._load()
 
         def getter(self):
-            city = self.__dict__.get(name, default)
+            city = load(self)
             if not city:
                 return None
 
@@ -1,5 +1,7 @@
 import typeschema.properties
-from typeschema.types.network import types
+from typeschema.types.network import (
+    int_to_ip, ip_to_int, pack_ip, types, unpack_ip,
+)
 
 _checker = typeschema.Checker()
 _checker.extend(types)
@@ -10,7 +12,7 @@ check = checker.check
 class ip(typeschema.properties.nullable):
     """
     Defines a property for a class whose setter checks that the input is a
-    valid ipv4 or None.
+    valid IPv4 or IPv6 address or None.
 
     >>> class MyClass(object):
     ...     my_attr = ip('my_attr', default='127.0.0.1')
@@ -33,3 +35,70 @@ class ip(typeschema.properties.nullable):
     """
     def __init__(self, name, default=None):
         super(ip, self).__init__(name, 'ip', default=default, check=check)
+
+
+class packed_ip(typeschema.properties.nullable):
+    """
+    Defines a property like ``ip``, but whose values are stored packed, which
+    takes about half the memory of the strings for IPv4 addresses. The
+    getter returns the addresses in their usual form.
+
+    With ``version=4`` or ``version=6`` only addresses of that version are
+    accepted, and they are stored as integers. Otherwise they are stored as
+    4 or 16 bytes.
+
+    >>> class MyClass(object):
+    ...     my_attr = packed_ip('my_attr', version=4)
+    >>> my = MyClass()
+    >>> my.my_attr = '10.0.0.1'
+    >>> my.my_attr
+    '10.0.0.1'
+    >>> my.__dict__['my_attr']
+    167772161
+    >>> my.my_attr = '::1'
+    Traceback (most recent call last):
+        ...
+    ValidationError: '::1' is not valid under any of the given schemas
+    <BLANKLINE>
+    Failed validating 'anyOf' in schema:
+        {'anyOf': [{'type': 'ipv4'}, {'type': 'null'}]}
+    <BLANKLINE>
+    On instance:
+        '::1'
+    """
+    def __init__(self, name, default=None, version=None):
+        if version not in (None, 4, 6):
+            raise ValueError('unknown IP version: %r' % (version,))
+        self.version = version
+        super(packed_ip, self).__init__(
+            name,
+            'ip' if version is None else 'ipv%d' % version,
+            default=default,
+            check=check
+        )
+
+    def _get_getter(self):
+        load = self._load()
+        pending = self._pending()
+        version = self.version
+
+        def getter(self):
+            value = load(self)
+            # Values not checked yet are returned as they were set.
+            if value is None or (pending is not None and pending(self)):
+                return value
+            if version is None:
+                return unpack_ip(value)
+            return int_to_ip(value, version)
+
+        return getter
+
+    def _coerce(self, value):
+        if value is None:
+            return None
+        try:
+            if self.version is None:
+                return pack_ip(value)
+            return ip_to_int(value, self.version)
+        except ValueError:
+            self._coerce_failed(value)
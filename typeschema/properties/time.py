@@ -1,36 +1,31 @@
-import datetime as dt
-
 import typeschema
 from typeschema.properties import nullable
-from typeschema.types.time import types
+from typeschema.types.time import coercions, types
 
 _checker = typeschema.Checker()
-_checker.extend(types)
+_checker.extend(types, coercions)
 checker = _checker.frozen()
 check = checker.check
 
 
 class _time_property(nullable):
     def __init__(self, typename, name, default=None):
+        self.typename = typename
         super(_time_property, self).__init__(
             name,
             typename,
             default=default,
             check=check
         )
-        self.default = self._convert(self.default)
-
-    def _get_setter(self):
-        schema = self.schema
-        name = self.name
-        check = self.check
-        _convert = self._convert
-
-        def setter(self, value):
-            check(value, schema)
-            self.__dict__[name] = _convert(value)
 
-        return setter
+    def _coerce(self, value):
+        # Values are parsed only once, to check and to convert them.
+        if value is None:
+            return None
+        try:
+            return checker.coerce(value, self.typename)
+        except typeschema.ValidationError:
+            self._coerce_failed(value)
 
 
 class datetime(_time_property):
@@ -53,13 +48,6 @@ class datetime(_time_property):
     def __init__(self, name, default=None):
         super(datetime, self).__init__('datetime', name, default=default)
 
-    def _convert(self, value):
-        if isinstance(value, int) or isinstance(value, float):
-            value = dt.datetime.fromtimestamp(value)
-        elif isinstance(value, basestring):
-            value = dt.datetime.strptime(value, '%Y-%m-%dT%H:%M:%SZ')
-        return value
-
 
 class date(_time_property):
     """
@@ -82,13 +70,6 @@ class date(_time_property):
     def __init__(self, name, default=None):
         super(date, self).__init__('date', name, default=default)
 
-    def _convert(self, value):
-        if isinstance(value, dt.datetime):
-            value = value.date()
-        elif isinstance(value, basestring):
-            value = dt.datetime.strptime(value, '%Y-%m-%d').date()
-        return value
-
 
 class time(_time_property):
     """
@@ -107,7 +88,3 @@ class time(_time_property):
     def __init__(self, name, default=None):
         super(time, self).__init__('time', name, default=default)
 
-    def _convert(self, value):
-        if isinstance(value, basestring):
-            value = dt.datetime.strptime(value, '%H:%M:%S').time()
-        return value
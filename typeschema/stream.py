@@ -0,0 +1,228 @@
+"""
+typeschema.stream validates JSON documents too big to be loaded at once,
+parsing and checking one record at a time.
+
+Files can be regular files or memory-mapped files (``mmap.mmap``), or any
+object with ``read`` and ``readline`` methods. Offsets are in bytes, counted
+from the position the file was at when validation started.
+
+>>> from StringIO import StringIO
+>>> records = StringIO('{"id": 1}\\n{"id": "2"}\\nnope\\n')
+>>> for offset, error in validate_ndjson(records, {
+...     'type': 'object',
+...     'properties': {'id': {'type': 'integer'}},
+... }):
+...     print offset, str(error).splitlines()[0]
+10 u'2' is not of type 'integer'
+22 No JSON object could be decoded
+"""
+
+import json
+import re
+
+import typeschema
+
+_decoder = json.JSONDecoder()
+_whitespace = ' \t\n\r'
+
+# Strings and brackets, or a quote starting a string that isn't finished.
+_STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"')
+_TOKENS = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|["\[\]{}]')
+_SCALAR_END = re.compile(r'[\s,\]}]')
+
+
+def validate_ndjson(fileobj, schema, checker=typeschema.checker):
+    """
+    Validates a file with a JSON value per line against a schema. Blank lines
+    are skipped.
+
+    Args:
+        fileobj: The file to read from.
+        schema: A JSON schema.
+        checker: The ``typeschema.Checker`` to use.
+
+    Yields:
+        A tuple ``(offset, error)`` for each invalid line, where error is
+        either a ``ValidationError`` or a ``ValueError`` if the line isn't
+        valid JSON.
+    """
+
+    compiled = checker.compile(schema)
+    offset = 0
+    for line in iter(fileobj.readline, ''):
+        if line.strip():
+            try:
+                value = json.loads(line)
+            except ValueError as e:
+                yield offset, e
+            else:
+                error = _error(compiled, value)
+                if error is not None:
+                    yield offset, error
+        offset += len(line)
+
+
+def validate_json_array(fileobj, schema, checker=typeschema.checker,
+                        chunk_size=64 * 1024):
+    """
+    Validates every item of a file with a JSON array against a schema.
+
+    The file is read in chunks of ``chunk_size`` bytes, and only the item
+    being parsed is kept in memory. Since the array can't be parsed past a
+    malformed item, the error for it is the last one yielded. Only the file
+    up to the end of that item is read, as told by its brackets and quotes.
+    After the array, only whitespace may follow.
+
+    Args:
+        fileobj: The file to read from.
+        schema: A JSON schema for the items.
+        checker: The ``typeschema.Checker`` to use.
+        chunk_size: Number of bytes to read at once.
+
+    Yields:
+        A tuple ``(offset, error)`` for each invalid item, where error is
+        either a ``ValidationError`` or a ``ValueError`` if the file isn't
+        valid JSON.
+
+    >>> from StringIO import StringIO
+    >>> items = StringIO('[1, 2, "3", 4.5]')
+    >>> for offset, error in validate_json_array(items, {'type': 'integer'},
+    ...                                          chunk_size=2):
+    ...     print offset, str(error).splitlines()[0]
+    7 u'3' is not of type 'integer'
+    12 4.5 is not of type 'integer'
+    """
+
+    compiled = checker.compile(schema)
+    reader = _ChunkReader(fileobj, chunk_size)
+
+    if reader.next_char() != '[':
+        yield reader.offset(), ValueError('expected a JSON array')
+        return
+
+    reader.pos += 1
+    expect_item = True
+    after_comma = False
+    while True:
+        char = reader.next_char()
+        if char == ']' and not after_comma:
+            reader.pos += 1
+            if reader.next_char() is not None:
+                yield reader.offset(), ValueError(
+                    'extra data after JSON array')
+            return
+        if char == ',' and not expect_item:
+            reader.pos += 1
+            expect_item = after_comma = True
+            continue
+        if char is None or not expect_item:
+            yield reader.offset(), ValueError('malformed JSON array')
+            return
+
+        offset = reader.offset()
+        try:
+            value = reader.decode()
+        except ValueError as e:
+            yield offset, e
+            return
+
+        error = _error(compiled, value)
+        if error is not None:
+            yield offset, error
+        expect_item = after_comma = False
+
+
+def _error(compiled, value):
+    if compiled.is_valid(value):
+        return None
+    try:
+        compiled(value)
+    except typeschema.ValidationError as e:
+        return e
+
+
+class _ChunkReader(object):
+    """
+    Keeps the unparsed tail of a file in a buffer, reading more only when
+    needed.
+    """
+
+    def __init__(self, fileobj, chunk_size):
+        self.fileobj = fileobj
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.base = 0
+        self.eof = False
+
+    def offset(self):
+        return self.base + self.pos
+
+    def read_more(self):
+        # Drop what's already been parsed, and read at least as much as the
+        # current partial value so that decoding a long one is still linear.
+        self.base += self.pos
+        self.buf = self.buf[self.pos:]
+        self.pos = 0
+        chunk = self.fileobj.read(max(self.chunk_size, len(self.buf)))
+        if not chunk:
+            self.eof = True
+        self.buf += chunk
+
+    def next_char(self):
+        """
+        Skips whitespace and returns the next character, or ``None`` at the
+        end of the file.
+        """
+
+        while True:
+            buf = self.buf
+            while self.pos < len(buf) and buf[self.pos] in _whitespace:
+                self.pos += 1
+            if self.pos < len(buf):
+                return buf[self.pos]
+            if self.eof:
+                return None
+            self.read_more()
+
+    def decode(self):
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except ValueError:
+                # Reading more only helps if the value may be cut, or else a
+                # malformed value would make the rest of the file be read.
+                if self.eof or _value_ends(self.buf, self.pos):
+                    raise
+            else:
+                # A value touching the end of the buffer, like a number, may
+                # continue in the next chunk.
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            self.read_more()
+
+
+def _value_ends(buf, pos):
+    """
+    Tells whether the JSON value starting at a position ends before the end
+    of a buffer, going only by its strings and brackets.
+    """
+
+    if buf[pos] == '"':
+        return _STRING.match(buf, pos) is not None
+    if buf[pos] not in '[{':
+        return _SCALAR_END.search(buf, pos) is not None
+
+    depth = 0
+    for match in _TOKENS.finditer(buf, pos):
+        token = match.group()
+        if token == '"':
+            return False
+        elif token in ('[', '{'):
+            depth += 1
+        elif token in (']', '}'):
+            depth -= 1
+            if depth == 0:
+                return True
+    return False
@@ -0,0 +1,19 @@
+# NumPy is optional, and slow to import, so the types that use it only
+# import it when first needed.
+_numpy = None
+_numpy_imported = False
+
+
+def _import_numpy():
+    """
+    Returns the numpy module, or None if it isn't installed.
+    """
+
+    global _numpy, _numpy_imported
+    if not _numpy_imported:
+        try:
+            import numpy as _numpy
+        except ImportError:
+            _numpy = None
+        _numpy_imported = True
+    return _numpy
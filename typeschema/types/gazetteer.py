@@ -0,0 +1,248 @@
+"""
+A city type checked against a gazetteer, a list of the cities of the world,
+instead of accepting any name like ``typeschema.types.location`` does.
+
+The gazetteer is read from an index file, a hash table of the cities that is
+memory-mapped, so it's loaded lazily by the operating system and shared by
+every process using the same file. Indexes are built from a dump in the
+GeoNames format (see http://download.geonames.org/export/dump/) with the
+``typeschema-index-cities`` command::
+
+    typeschema-index-cities cities15000.txt cities.index
+
+Cities are pairs of a name and the ISO 3166 alpha-2 code of their country,
+as in the GeoNames dumps. Names and codes are compared ignoring case and
+surrounding whitespace. The ``city`` type also takes the names of the
+countries, like ``typeschema.types.location`` does, and looks their codes
+up with ``typeschema.types.location.country_code``.
+
+>>> import os, tempfile
+>>> path = os.path.join(tempfile.mkdtemp(), 'cities.index')
+>>> build_index([('Madrid', 'ES'), ('Roma', 'IT')], path)
+2
+>>> gazetteer = Gazetteer(path)
+>>> gazetteer.contains(' madrid', 'es'), gazetteer.contains('Madrid', 'IT')
+(True, False)
+
+The ``city`` type is then defined with it:
+
+    >>> from typeschema import Checker
+    >>> checker = Checker()
+    >>> checker.define('city', gazetteer.is_city)
+    >>> checker.check(['Madrid', 'ES'], {'type': 'city'})
+    >>> checker.is_valid(['Madrid', 'IT'], {'type': 'city'})
+    False
+"""
+
+import argparse
+import hashlib
+import mmap
+import os
+import re
+import struct
+import sys
+import tempfile
+
+import typeschema.types.location
+
+# The file starts with a header, followed by a table with a slot for each
+# 8 bytes of the digest of a city, or zeros for the empty ones. The number of
+# slots is a power of two, at least twice the number of cities, and
+# collisions are resolved by taking the next empty slot.
+_MAGIC = 'TSCITY01'
+_HEADER = struct.Struct('<8sQQ')
+_SLOT = struct.Struct('<Q')
+_EMPTY = '\0' * _SLOT.size
+_md5 = hashlib.md5
+_ALPHA2 = re.compile(r'\s*[A-Za-z]{2}\s*\Z')
+
+
+def _digest(name, country):
+    """
+    Returns the digest of a city, given its name and the ISO 3166 alpha-2
+    code of its country, or None if either of them isn't valid.
+    """
+
+    if not isinstance(country, basestring) or not _ALPHA2.match(country):
+        return None
+    # Both are hashed as bytes, and the code is known to be ASCII.
+    country = str(country).strip().upper()
+
+    if isinstance(name, str):
+        try:
+            name = name.decode('utf-8')
+        except UnicodeDecodeError:
+            return None
+    elif not isinstance(name, unicode):
+        return None
+    key = '%s\0%s' % (
+        name.strip().lower().encode('utf-8'), country)
+    digest = _md5(key).digest()[:_SLOT.size]
+    if digest == _EMPTY:
+        return '\1' + digest[1:]
+    return digest
+
+
+def build_index(cities, path):
+    """
+    Writes an index file for ``Gazetteer``.
+
+    The file is written aside and then renamed, so processes using a
+    previous version of it keep reading that one.
+
+    Args:
+        cities: An iterable of ``(name, country)`` pairs, where the country
+            is an ISO 3166 alpha-2 code.
+        path: The path of the index file.
+
+    Returns:
+        The number of different cities in the index.
+    """
+
+    digests = set()
+    for name, country in cities:
+        digest = _digest(name, country)
+        if digest is not None:
+            digests.add(digest)
+
+    slots = 2
+    while slots < 2 * len(digests):
+        slots *= 2
+    mask = slots - 1
+    table = bytearray(slots * _SLOT.size)
+    for digest in digests:
+        slot = _SLOT.unpack(digest)[0] & mask
+        while table[slot * _SLOT.size:(slot + 1) * _SLOT.size] != _EMPTY:
+            slot = (slot + 1) & mask
+        table[slot * _SLOT.size:(slot + 1) * _SLOT.size] = digest
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, slots, len(digests)))
+            f.write(table)
+        # mkstemp only lets the owner read it.
+        os.chmod(temp_path, 0644)
+        os.rename(temp_path, path)
+    except Exception:
+        os.unlink(temp_path)
+        raise
+    return len(digests)
+
+
+class Gazetteer(object):
+    """
+    The cities in an index file written by ``build_index``.
+
+    Gazetteers can be pickled, as long as the file is in the same path where
+    they are unpickled, so they can be used in checkers sent to other
+    processes.
+
+    Args:
+        path: The path of the index file.
+
+    Raises:
+        ValueError: If the file isn't an index.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                raise ValueError('not a city index: %r' % (path,))
+            magic, slots, size = _HEADER.unpack(header)
+            if magic != _MAGIC:
+                raise ValueError('not a city index: %r' % (path,))
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._mask = slots - 1
+        self._size = size
+
+    def __getstate__(self):
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'])
+
+    def __len__(self):
+        return self._size
+
+    def close(self):
+        self._data.close()
+
+    def contains(self, name, country):
+        """
+        Tells whether there is a city with a name in the country with the
+        given ISO 3166 alpha-2 code.
+        """
+
+        digest = _digest(name, country)
+        if digest is None:
+            return False
+        data = self._data
+        mask = self._mask
+        slot = _SLOT.unpack(digest)[0] & mask
+        while True:
+            offset = _HEADER.size + slot * _SLOT.size
+            stored = data[offset:offset + _SLOT.size]
+            if stored == digest:
+                return True
+            if stored == _EMPTY:
+                return False
+            slot = (slot + 1) & mask
+
+    def is_city(self, value):
+        """
+        A predicate for the ``city`` type: tells whether a value is a
+        ``(name, country)`` pair of a city in the gazetteer, where the
+        country is an ISO 3166 alpha-2 code or the name of a country.
+        """
+
+        if not isinstance(value, (list, tuple)) or len(value) != 2:
+            return False
+        name, country = value
+        if isinstance(country, basestring) and not _ALPHA2.match(country):
+            country = typeschema.types.location.country_code(country)
+        return self.contains(name, country)
+
+
+def _read_geonames(lines, alternate_names=False):
+    # Columns are tab-separated: the name is the second one, its ASCII
+    # version the third one, the alternate names the fourth one, and the
+    # country code the ninth one.
+    for line in lines:
+        columns = line.rstrip('\r\n').split('\t')
+        if len(columns) < 9 or line.startswith('#'):
+            continue
+        country = columns[8]
+        names = set(columns[1:3])
+        if alternate_names and columns[3]:
+            names.update(columns[3].split(','))
+        for name in names:
+            if name:
+                yield name, country
+
+
+def main(argv=None):
+    """
+    The ``typeschema-index-cities`` command.
+    """
+
+    parser = argparse.ArgumentParser(
+        description='Builds a city index for typeschema.types.gazetteer '
+                    'from a GeoNames dump.')
+    parser.add_argument('geonames', help='GeoNames file, like cities15000.txt')
+    parser.add_argument('index', help='index file to write')
+    parser.add_argument('--alternate-names', action='store_true',
+                        help='index the alternate names of the cities too')
+    args = parser.parse_args(argv)
+
+    with open(args.geonames, 'rb') as f:
+        size = build_index(
+            _read_geonames(f, args.alternate_names), args.index)
+    print 'Indexed %d cities in %s' % (size, args.index)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,6 +3,7 @@ location related types:
 
 * country: the city is a string contained in the following list: http://en.wikipedia.org/wiki/List_of_sovereign_states_and_dependent_territories_by_continent_(data_file)
 * city: is a dict with name key and country key. The name could be any string.
+  See typeschema.types.gazetteer for a city type that checks the names too.
 
 >>> from typeschema import Checker
 >>> import typeschema.types.location
@@ -35,22 +36,76 @@ On instance:
 
 import collections
 
-import incf.countryutils.datatypes as datatypes
+import typeschema._cache
 
 
 class City(collections.namedtuple('City', ['name', 'country'])):
     @property
     def country(self):
-        return datatypes.Country(self[1])
+        return find_country(self[1])
 
     def to_validate(self):
         return list(self)
 
 
-def is_country(value):
+# Countries, or None for strings that aren't one, by the strings they were
+# looked up with, so that rejecting an invalid value is a lookup too.
+_lookups = typeschema._cache.LRUCache(1024)
+# The shared Country for each country by its name, since incf.countryutils
+# may accept several spellings of the same one.
+_countries = {}
+_missing = object()
+
+
+def _datatypes():
+    # incf.countryutils loads its tables when imported, so it's only imported
+    # when a country is first looked up.
+    import incf.countryutils.datatypes as datatypes
+    return datatypes
+
+
+def find_country(value):
+    """
+    Returns the ``Country`` for a string, or ``None`` if incf.countryutils
+    doesn't take it for a country.
+
+    The results for the last strings looked up are kept, and the same
+    ``Country`` instance is returned every time for the same country, so
+    they must not be modified.
+
+    >>> find_country('Spain') is find_country('Spain')
+    True
+    >>> print find_country('Foo')
+    None
+    """
+
     if not isinstance(value, basestring):
-        return False
-    return datatypes.Country(value)
+        return None
+    country = _lookups.get(value, _missing)
+    if country is _missing:
+        country = _datatypes().Country(value)
+        if country:
+            country = _countries.setdefault(country.name, country)
+        else:
+            country = None
+        _lookups.put(value, country)
+    return country
+
+
+def country_code(value):
+    """
+    Returns the ISO 3166 alpha-2 code of a country given like for
+    ``find_country``, or ``None`` if there is no such country.
+    """
+
+    country = find_country(value)
+    if country is None:
+        return None
+    return str(country.alpha2)
+
+
+def is_country(value):
+    return find_country(value) is not None
 
 
 def is_city(value):
@@ -1,10 +1,24 @@
 """
 networking related types:
 
+* ipv4: a string with an IPv4 address in dotted decimal form, like
+  ``'127.0.0.1'``, without leading zeros.
+* ipv6: a string with an IPv6 address, like ``'::1'``.
+* ip: either an ipv4 or an ipv6.
+* cidr: a string with an IPv4 or IPv6 network in CIDR notation, like
+  ``'10.0.0.0/8'``. The bits of the address out of the prefix must be zero.
+
+Types for the addresses in some networks are defined with ``Networks``.
+
+Addresses are parsed by ``socket.inet_pton``, so the check is done in C and
+is as strict as the platform's.
+
 >>> from typeschema import Checker
 >>> checker = Checker()
 >>> checker.extend(typeschema.types.network.types)
 >>> checker.check("127.0.0.1", {'type': 'ip'})
+>>> checker.check("::1", {'type': 'ip'})
+>>> checker.check("10.0.0.0/8", {'type': 'cidr'})
 >>> checker.check("Foo", {'type': 'ip'})
 Traceback (most recent call last):
     ...
@@ -15,21 +29,312 @@ Failed validating 'type' in schema:
 <BLANKLINE>
 On instance:
     'Foo'
+
+>>> checker.is_valid("1", {'type': 'ip'})
+False
+>>> checker.is_valid("10.0.0.1/8", {'type': 'cidr'})
+False
 """
 
+import re
 import socket
+import struct
 
 import typeschema
+import typeschema.types
+
+_families = {4: socket.AF_INET, 6: socket.AF_INET6}
+_inet_pton = socket.inet_pton
+_LONG = struct.Struct('!QQ')
+_INT = struct.Struct('!I')
+# No signs, spaces or leading zeros.
+_PREFIX = re.compile(r'(0|[1-9]\d{0,2})\Z')
+
+
+def pack_ip(value, version=None):
+    """
+    Returns the packed form of an IP address: 4 bytes for IPv4 addresses and
+    16 bytes for IPv6 ones.
+
+    Args:
+        value: A string with an address.
+        version: 4 or 6 to accept only addresses of that version, or None to
+            accept both.
+
+    Raises:
+        ValueError: If the value isn't an address.
+
+    >>> pack_ip('127.0.0.1')
+    '\\x7f\\x00\\x00\\x01'
+    >>> len(pack_ip('::1'))
+    16
+    >>> pack_ip('::1', version=4)
+    Traceback (most recent call last):
+        ...
+    ValueError: not an IPv4 address: '::1'
+    """
+
+    if isinstance(value, basestring):
+        if version is None:
+            # Only IPv6 addresses have colons.
+            version = 6 if ':' in value else 4
+        try:
+            return _inet_pton(_families[version], value)
+        except (socket.error, TypeError, ValueError):
+            # TypeError for strings with null bytes, and ValueError for
+            # unicode strings that aren't ASCII.
+            pass
+    if version is None:
+        raise ValueError('not an IP address: %r' % (value,))
+    raise ValueError('not an IPv%d address: %r' % (version, value))
+
+
+def unpack_ip(packed):
+    """
+    Returns the usual string form of a packed IP address.
+
+    >>> unpack_ip(pack_ip('2001:0db8:0000::0001'))
+    '2001:db8::1'
+    """
+
+    return socket.inet_ntop(
+        socket.AF_INET if len(packed) == 4 else socket.AF_INET6, packed)
+
+
+def ip_to_int(value, version=None):
+    """
+    Returns an IP address as an integer. IPv4 and IPv6 addresses may have
+    the same number, so version should be given for mixed values.
+
+    >>> ip_to_int('10.0.0.1')
+    167772161
+    >>> ip_to_int('2001:db8::1')
+    42540766411282592856903984951653826561L
+    """
+
+    return _packed_to_int(pack_ip(value, version))
+
+
+def _packed_to_int(packed):
+    if len(packed) == 4:
+        return _INT.unpack(packed)[0]
+    high, low = _LONG.unpack(packed)
+    return high << 64 | low
+
+
+def int_to_ip(number, version):
+    """
+    Returns the usual string form of an IP address given as an integer.
+
+    >>> int_to_ip(167772161, 4)
+    '10.0.0.1'
+    >>> int_to_ip(1, 6)
+    '::1'
+    """
+
+    if version == 4:
+        return socket.inet_ntop(socket.AF_INET, _INT.pack(number))
+    return socket.inet_ntop(socket.AF_INET6, _LONG.pack(
+        number >> 64, number & 0xffffffffffffffff))
+
+
+def parse_cidr(value):
+    """
+    Returns the packed address and the prefix length of a network in CIDR
+    notation.
+
+    Raises:
+        ValueError: If the value isn't a network, or if it has bits set out
+            of the prefix.
+
+    >>> parse_cidr('192.168.0.0/16')
+    ('\\xc0\\xa8\\x00\\x00', 16)
+    >>> parse_cidr('192.168.0.1/16')
+    Traceback (most recent call last):
+        ...
+    ValueError: host bits set in network: '192.168.0.1/16'
+    """
+
+    if not isinstance(value, basestring) or value.count('/') != 1:
+        raise ValueError('not a network: %r' % (value,))
+    address, prefix = value.split('/')
+    packed = pack_ip(address)
+    bits = len(packed) * 8
+    if not _PREFIX.match(prefix) or int(prefix) > bits:
+        raise ValueError('not a network: %r' % (value,))
+    prefix = int(prefix)
+    if _packed_to_int(packed) & ((1 << (bits - prefix)) - 1):
+        raise ValueError('host bits set in network: %r' % (value,))
+    return packed, prefix
+
+
+def is_ipv4(value):
+    try:
+        pack_ip(value, 4)
+    except ValueError:
+        return False
+    return True
+
+
+def is_ipv6(value):
+    try:
+        pack_ip(value, 6)
+    except ValueError:
+        return False
+    return True
 
 
 def is_ip(value):
     try:
-        socket.inet_aton(value)
-        return True
-    except:
+        pack_ip(value)
+    except ValueError:
+        return False
+    return True
+
+
+def is_cidr(value):
+    try:
+        parse_cidr(value)
+    except ValueError:
         return False
+    return True
+
+
+class Networks(object):
+    """
+    A predicate telling whether an IP address is in some networks, to define
+    types for the addresses allowed to do something.
+
+    The most specific network containing an address decides whether it's
+    accepted. Addresses in none of them are accepted only if there are no
+    allowed networks. Values that aren't addresses are never accepted.
+
+    Networks are kept in a table per prefix length, so an address is looked
+    up once per length, however many networks there are.
+
+    Args:
+        allow: An iterable of networks in CIDR notation.
+        deny: An iterable of networks in CIDR notation.
+
+    Raises:
+        ValueError: If some network isn't valid, or is both allowed and
+            denied.
+
+    >>> internal = Networks(allow=['10.0.0.0/8', 'fd00::/8'],
+    ...                     deny=['10.66.0.0/16'])
+    >>> internal('10.1.2.3'), internal('10.66.1.1'), internal('fd00::1')
+    (True, False, True)
+    >>> internal('8.8.8.8'), internal('Foo')
+    (False, False)
+
+    >>> from typeschema import Checker
+    >>> checker = Checker()
+    >>> checker.define('internal', internal)
+    >>> checker.check('10.1.2.3', {'type': 'internal'})
+    """
+
+    def __init__(self, allow=(), deny=()):
+        verdicts = {}
+        for cidrs, allowed in [(allow, True), (deny, False)]:
+            for cidr in cidrs:
+                packed, prefix = parse_cidr(cidr)
+                key = (len(packed) * 8, prefix, _packed_to_int(packed))
+                if verdicts.setdefault(key, allowed) != allowed:
+                    raise ValueError(
+                        'network both allowed and denied: %r' % (cidr,))
+
+        tables = {32: {}, 128: {}}
+        for (bits, prefix, number), allowed in verdicts.iteritems():
+            shift = bits - prefix
+            tables[bits].setdefault(shift, {})[number >> shift] = allowed
+
+        # Tables are looked up from the most specific one, as pairs of the
+        # bits to drop from an address and a dictionary of the prefixes.
+        self._tables = dict(
+            (bits, sorted(tables[bits].items())) for bits in tables)
+        self._default = not any(allowed for allowed in verdicts.itervalues())
+
+    def __call__(self, value):
+        try:
+            packed = pack_ip(value)
+        except ValueError:
+            return False
+        return self._lookup(len(packed) * 8, _packed_to_int(packed))
+
+    def _lookup(self, bits, number):
+        for shift, prefixes in self._tables[bits]:
+            allowed = prefixes.get(number >> shift)
+            if allowed is not None:
+                return allowed
+        return self._default
+
+    def check_many(self, values):
+        """
+        Tells which of a column of values are accepted.
+
+        If NumPy is installed, returns a boolean array, and arrays of
+        integers are taken as IPv4 addresses and checked in vectorized form.
+        Anything else is parsed value by value, and then the IPv4 addresses
+        are checked in vectorized form. Without NumPy, returns a list of
+        booleans.
+
+        >>> internal = Networks(allow=['10.0.0.0/8'])
+        >>> mask = internal.check_many(['10.0.0.1', '::1', 'Foo'])
+        >>> [True if accepted else False for accepted in mask]
+        [True, False, False]
+        """
+
+        numpy = typeschema.types._import_numpy()
+        if numpy is None:
+            return [self(value) for value in values]
+
+        if isinstance(values, numpy.ndarray) and values.dtype.kind in 'iu':
+            numbers = values.astype(numpy.int64)
+            in_range = (numbers >= 0) & (numbers <= 0xffffffff)
+            result = numpy.zeros(len(values), dtype=bool)
+            result[in_range] = self._lookup_ipv4s(numbers[in_range], numpy)
+            return result
+
+        result = numpy.zeros(len(values), dtype=bool)
+        ipv4s = []
+        indices = []
+        for index, value in enumerate(values):
+            try:
+                packed = pack_ip(value)
+            except ValueError:
+                continue
+            if len(packed) == 4:
+                ipv4s.append(_INT.unpack(packed)[0])
+                indices.append(index)
+            else:
+                result[index] = self._lookup(128, _packed_to_int(packed))
+        result[indices] = self._lookup_ipv4s(
+            numpy.array(ipv4s, dtype=numpy.int64), numpy)
+        return result
+
+    def _lookup_ipv4s(self, numbers, numpy):
+        result = numpy.empty(len(numbers), dtype=bool)
+        result.fill(self._default)
+        pending = numpy.ones(len(numbers), dtype=bool)
+        for shift, prefixes in self._tables[32]:
+            if not pending.any():
+                break
+            keys = numpy.array(sorted(prefixes), dtype=numpy.int64)
+            allowed = numpy.array(
+                [prefixes[key] for key in keys.tolist()], dtype=bool)
+            wanted = numbers[pending] >> shift
+            found = numpy.searchsorted(keys, wanted)
+            found[found == len(keys)] = 0
+            hit = keys[found] == wanted
+            indices = numpy.flatnonzero(pending)[hit]
+            result[indices] = allowed[found[hit]]
+            pending[indices] = False
+        return result
 
 
 types = {
-    'ip': is_ip
+    'ip': is_ip,
+    'ipv4': is_ipv4,
+    'ipv6': is_ipv6,
+    'cidr': is_cidr,
 }
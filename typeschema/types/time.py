@@ -4,6 +4,8 @@ Typeschema types for dates and times.
 The type ``datetime`` accepts instances of ``datetime`` from the ``datetime``
 module; an ``int`` or a ``float`` with a Unix timestamp in seconds; or a
 ``str`` conforming to ISO 8601 for UTC times (``yyyy-mm-ddThh:mm:ssZ``).
+The seconds can have a fraction, and ``Z`` can be replaced with an offset
+from UTC like ``+hh:mm`` or ``-hh:mm``.
 
 >>> import typeschema
 >>> checker = typeschema.Checker()
@@ -34,7 +36,8 @@ Traceback (most recent call last):
 ValidationError: ...
 
 The type ``time`` accepts instances of ``time`` from the ``datetime`` module;
-or a ``str`` conforming to ISO 8601 for UTC times (``hh:mm:ss``).
+or a ``str`` conforming to ISO 8601 for UTC times (``hh:mm:ss``), where the
+seconds can have a fraction.
 
 >>> checker.check(datetime.utcnow(), {'type': 'time'})
 Traceback (most recent call last):
@@ -42,26 +45,104 @@ Traceback (most recent call last):
 ValidationError: ...
 >>> checker.check(datetime.utcnow().time(), {'type': 'time'})
 >>> checker.check('18:25:43', {'type': 'time'})
+
+Each type also has a function in ``coercions`` that converts its values to
+``datetime``, ``date`` or ``time`` instances, for ``Checker.coerce``:
+
+>>> checker = typeschema.Checker()
+>>> checker.extend(typeschema.types.time.types, coercions)
+>>> checker.coerce('2012-04-23T18:25:43Z', 'datetime')
+datetime.datetime(2012, 4, 23, 18, 25, 43)
+
+Times with an offset are converted to UTC:
+
+>>> checker.coerce('2012-04-23T18:25:43.5+02:00', 'datetime')
+datetime.datetime(2012, 4, 23, 16, 25, 43, 500000)
 """
 
 import datetime as dt
+import re
+
+import typeschema.types
+
+# Set by to_datetimes, since NumPy is only imported when first needed.
+numpy = None
+
+# Fast paths for the usual forms of the formats; anything else goes through
+# strptime, which is much slower.
+_DATETIME = re.compile(
+    r'(\d\d)(\d\d)-(\d\d)-(\d\d)T(\d\d):(\d\d):(\d\d)(?:\.(\d{1,6})\d*)?'
+    r'(?:Z|([+-])(\d\d):(\d\d))\Z')
+_DATE = re.compile(r'(\d\d)(\d\d)-(\d\d)-(\d\d)\Z')
+_TIME = re.compile(r'(\d\d):(\d\d):(\d\d)(?:\.(\d{1,6})\d*)?\Z')
+
+# Looking up pairs of digits is much faster than calling int.
+_PAIRS = dict(('%02d' % i, i) for i in range(100))
+
+
+def _microseconds(fraction):
+    if fraction is None:
+        return 0
+    return int(fraction.ljust(6, '0'))
+
+
+def _parse_datetime(value):
+    match = _DATETIME.match(value)
+    if match is None:
+        return dt.datetime.strptime(value, '%Y-%m-%dT%H:%M:%SZ')
+
+    (century, year, month, day, hour, minute, second, fraction,
+     sign, offset_hours, offset_minutes) = match.groups()
+    result = dt.datetime(
+        _PAIRS[century] * 100 + _PAIRS[year], _PAIRS[month], _PAIRS[day],
+        _PAIRS[hour], _PAIRS[minute], _PAIRS[second], _microseconds(fraction))
+    if sign is not None:
+        offset_hours = _PAIRS[offset_hours]
+        offset_minutes = _PAIRS[offset_minutes]
+        if offset_hours > 23 or offset_minutes > 59:
+            raise ValueError('invalid UTC offset: %r' % (value,))
+        offset = dt.timedelta(hours=offset_hours, minutes=offset_minutes)
+        try:
+            result = result - offset if sign == '+' else result + offset
+        except OverflowError:
+            # In UTC, it's out of the range of datetime.
+            raise ValueError('date out of range: %r' % (value,))
+    return result
+
+
+def _parse_date(value):
+    match = _DATE.match(value)
+    if match is None:
+        return dt.datetime.strptime(value, '%Y-%m-%d').date()
+    century, year, month, day = match.groups()
+    return dt.date(
+        _PAIRS[century] * 100 + _PAIRS[year], _PAIRS[month], _PAIRS[day])
+
+
+def _parse_time(value):
+    match = _TIME.match(value)
+    if match is None:
+        return dt.datetime.strptime(value, '%H:%M:%S').time()
+    hour, minute, second, fraction = match.groups()
+    return dt.time(_PAIRS[hour], _PAIRS[minute], _PAIRS[second],
+                   _microseconds(fraction))
 
 
 def is_datetime(value):
-    if any(isinstance(value, t) for t in [int, float, dt.datetime]):
+    if isinstance(value, (int, float, dt.datetime)):
         return True
     try:
-        dt.datetime.strptime(value, '%Y-%m-%dT%H:%M:%SZ')
+        _parse_datetime(value)
         return True
     except ValueError:
         return False
 
 
 def is_date(value):
-    if any(isinstance(value, t) for t in [dt.date, dt.datetime]):
+    if isinstance(value, dt.date):
         return True
     try:
-        dt.datetime.strptime(value, '%Y-%m-%d')
+        _parse_date(value)
         return True
     except ValueError:
         return False
@@ -71,13 +152,207 @@ def is_time(value):
     if isinstance(value, dt.time):
         return True
     try:
-        dt.datetime.strptime(value, '%H:%M:%S')
+        _parse_time(value)
         return True
     except ValueError:
         return False
 
+
+def to_datetime(value):
+    if isinstance(value, dt.datetime):
+        return value
+    if isinstance(value, (int, float)):
+        return dt.datetime.fromtimestamp(value)
+    return _parse_datetime(value)
+
+
+def to_date(value):
+    if isinstance(value, dt.datetime):
+        return value.date()
+    if isinstance(value, dt.date):
+        return value
+    return _parse_date(value)
+
+
+def to_time(value):
+    if isinstance(value, dt.time):
+        return value
+    return _parse_time(value)
+
+
+_EPOCH = dt.datetime(1970, 1, 1)
+# The timestamps of 0001-01-01T00:00:00Z and 9999-12-31T23:59:59Z, the range
+# of datetime.
+_MIN_TIMESTAMP = -62135596800
+_MAX_TIMESTAMP = 253402300799
+
+
+def to_datetimes(values):
+    """
+    Checks and converts a column of values of the ``datetime`` type at once.
+
+    Unlike ``to_datetime``, which uses local time like
+    ``datetime.fromtimestamp``, timestamps are taken as UTC, like strings.
+
+    If NumPy is installed, returns a boolean array telling which values are
+    valid, and a ``datetime64[us]`` array with the converted values, and
+    ``NaT`` for the invalid ones. NumPy arrays of numbers, of ``datetime64``,
+    or of byte strings in the ``yyyy-mm-ddThh:mm:ssZ`` form are checked in
+    vectorized form, and anything else value by value.
+
+    Without NumPy, returns a list of booleans and a list of ``datetime``
+    instances, with ``None`` for the invalid values.
+
+    >>> mask, converted = to_datetimes([0, '2012-04-23T18:25:43Z', 'Foo'])
+    >>> [True if valid else False for valid in mask]
+    [True, True, False]
+    """
+
+    global numpy
+    numpy = typeschema.types._import_numpy()
+    if numpy is None:
+        mask, result = [], []
+        for value in values:
+            converted = _batch_datetime(value)
+            mask.append(converted is not None)
+            result.append(converted)
+        return mask, result
+
+    if not isinstance(values, numpy.ndarray):
+        # Letting NumPy guess the type could turn numbers into strings.
+        array = numpy.empty(len(values), dtype=object)
+        array[:] = values
+        values = array
+
+    kind = values.dtype.kind
+    if kind == 'M':
+        result = values.astype('datetime64[us]')
+        return result.view(numpy.int64) != _NAT, result
+
+    mask = numpy.zeros(len(values), dtype=bool)
+    result = numpy.empty(len(values), dtype='datetime64[us]')
+    result.view(numpy.int64)[:] = _NAT
+
+    if kind in 'iuf':
+        seconds = values.astype(numpy.float64)
+        # NaNs compare as False, so they are invalid.
+        with numpy.errstate(invalid='ignore'):
+            mask = (seconds >= _MIN_TIMESTAMP) & (seconds <= _MAX_TIMESTAMP)
+        microseconds = numpy.round(seconds[mask] * 1e6).astype(numpy.int64)
+        result[mask] = microseconds.astype('datetime64[us]')
+        return mask, result
+
+    rest = numpy.ones(len(values), dtype=bool)
+    if kind == 'S' and values.dtype.itemsize >= 20:
+        fixed, microseconds = _fixed_datetimes(values)
+        mask[fixed] = True
+        result[fixed] = microseconds.astype('datetime64[us]')
+        rest = ~fixed
+
+    for index in numpy.flatnonzero(rest):
+        converted = _batch_datetime(values[index])
+        if converted is not None:
+            mask[index] = True
+            result[index] = converted
+    return mask, result
+
+
+def _batch_datetime(value):
+    """
+    Converts a value like to_datetime, but with timestamps in UTC, and
+    returns None for invalid values.
+    """
+
+    try:
+        if isinstance(value, dt.datetime):
+            return value
+        if isinstance(value, (int, long, float)):
+            if not _MIN_TIMESTAMP <= value <= _MAX_TIMESTAMP:
+                return None
+            return _EPOCH + dt.timedelta(seconds=value)
+        return _parse_datetime(value)
+    except (ValueError, TypeError, OverflowError):
+        return None
+
+
+# The value of NaT, as an int64.
+_NAT = -2 ** 63
+
+# Positions of the digits and of the separators in yyyy-mm-ddThh:mm:ssZ.
+_DIGITS = [0, 1, 2, 3, 5, 6, 8, 9, 11, 12, 14, 15, 17, 18]
+_SEPARATORS = [(4, '-'), (7, '-'), (10, 'T'), (13, ':'), (16, ':'), (19, 'Z')]
+_MONTH_DAYS = [0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+
+
+def _fixed_datetimes(values):
+    """
+    Parses an array of byte strings in the yyyy-mm-ddThh:mm:ssZ form,
+    returning which ones are valid, and their microseconds since the epoch.
+    """
+
+    size = values.dtype.itemsize
+    chars = numpy.ascontiguousarray(values).view(numpy.uint8).reshape(
+        len(values), size)
+
+    valid = numpy.ones(len(values), dtype=bool)
+    if size > 20:
+        # Shorter strings are padded with zeros.
+        valid &= chars[:, 20] == 0
+    for position, separator in _SEPARATORS:
+        valid &= chars[:, position] == ord(separator)
+
+    digits = chars[:, _DIGITS].astype(numpy.int64) - ord('0')
+    valid &= ((digits >= 0) & (digits <= 9)).all(axis=1)
+    digits = digits.T
+    year = digits[0] * 1000 + digits[1] * 100 + digits[2] * 10 + digits[3]
+    month = digits[4] * 10 + digits[5]
+    day = digits[6] * 10 + digits[7]
+    hour = digits[8] * 10 + digits[9]
+    minute = digits[10] * 10 + digits[11]
+    second = digits[12] * 10 + digits[13]
+
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    month_days = numpy.array(_MONTH_DAYS)[numpy.clip(month, 0, 12)]
+    month_days += leap & (month == 2)
+    valid &= (
+        (year >= 1) & (month >= 1) & (month <= 12) &
+        (day >= 1) & (day <= month_days) &
+        (hour < 24) & (minute < 60) & (second < 60)
+    )
+
+    days = _days_from_civil(year[valid], month[valid], day[valid])
+    seconds = (days * 86400 + hour[valid] * 3600 + minute[valid] * 60 +
+               second[valid])
+    return valid, seconds * 1000000
+
+
+def _days_from_civil(year, month, day):
+    """
+    Returns the number of days from 1970-01-01 to a date of the proleptic
+    Gregorian calendar, for years from 1 on. Works with NumPy arrays too.
+
+    >>> _days_from_civil(1970, 1, 1), _days_from_civil(2000, 3, 1)
+    (0, 11017)
+    """
+
+    # Counting from March makes the leap day the last day of the year.
+    year = year - (month <= 2)
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * ((month + 9) % 12) + 2) // 5 + day - 1
+    day_of_era = (year_of_era * 365 + year_of_era // 4 - year_of_era // 100 +
+                  day_of_year)
+    return era * 146097 + day_of_era - 719468
+
+
 types = {
     'datetime': is_datetime,
     'date': is_date,
     'time': is_time,
 }
+
+coercions = {
+    'datetime': to_datetime,
+    'date': to_date,
+    'time': to_time,
+}
@@ -3,17 +3,74 @@ typeschema is a wrapper for jsonschema that provides some helpers, a simpler
 interface, and lets the user define its own types.
 """
 
+import copy
+
 import jsonschema as js
 
+from . import _compiler
+from ._cache import LRUCache, MemoizedPredicate, fingerprint
+
+# Modes for check_many.
+FAIL_FAST = 'fail_fast'
+COLLECT_ALL = 'collect_all'
+INVALID_INDICES = 'invalid_indices'
+_CHECK_MANY_MODES = (FAIL_FAST, COLLECT_ALL, INVALID_INDICES)
+
+
+class Memoize(object):
+    """
+    A policy for ``Checker.define`` to remember the results of a function for
+    up to ``maxsize`` distinct values (``None`` for unbounded), and
+    optionally only for ``ttl`` seconds.
+    """
+
+    def __init__(self, maxsize=1024, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+
 
 class Checker(object):
     """
     A Checker wraps a jsonschema.Draft4Validator, allowing the user to define
     custom types.
+
+    Checkers can be pickled as long as the definitions of their types can,
+    e.g. schemas, or classes and functions defined at module level.
+
+    Schemas are compiled once (see ``compile``) and kept in a LRU cache of
+    ``cache_size`` entries (``None`` for unbounded, ``0`` to disable it). The
+    cache is cleared whenever a type is defined.
+
+    >>> checker = Checker(cache_size=2)
+    >>> checker.check(1, {'type': 'integer'})
+    >>> checker.check(2, {'type': 'integer'})
+    >>> checker.cache_info()
+    CacheInfo(hits=1, misses=1, maxsize=2, currsize=1)
     """
 
-    def __init__(self):
+    def __init__(self, cache_size=256):
         self._validator = js.validators.extend(js.Draft4Validator, {})
+        self._cache = LRUCache(cache_size)
+        self._definitions = {}
+        self._coercions = {}
+        # Bumped on every definition, so that compiled schemas know when
+        # they have to be generated again.
+        self._generation = 0
+
+    def __getstate__(self):
+        # The type table holds classes created on the fly by define, which
+        # can't be pickled, so the checker is rebuilt from the definitions.
+        return {
+            'cache_size': self._cache.maxsize,
+            'definitions': self._definitions,
+            'coercions': self._coercions,
+        }
+
+    def __setstate__(self, state):
+        Checker.__init__(self, state['cache_size'])
+        for name, definition in state['definitions'].iteritems():
+            Checker.define(self, name, definition,
+                           coerce=state['coercions'].get(name))
 
     def check(self, value, schema):
         """
@@ -36,12 +93,97 @@ class Checker(object):
                 See the jsonschema documentation for validate.
         """
 
-        if "to_validate" in dir(value):
-            value = value.to_validate()
+        self.compile(schema)(value)
+
+    def check_many(self, values, schema, mode=COLLECT_ALL):
+        """
+        Checks every value of an iterable against the same JSON schema,
+        compiling it only once. See ``CompiledSchema.check_many`` for the
+        available modes.
+
+        >>> checker = Checker()
+        >>> schema = {'type': 'integer'}
+        >>> checker.check_many([1, 2, 'c'], schema, INVALID_INDICES)
+        [2]
+        """
+
+        return self.compile(schema).check_many(values, mode)
+
+    def is_valid(self, value, schema):
+        """
+        Returns whether a value complies with a JSON schema.
+
+        Unlike ``check``, this stops at the first failing keyword and, for
+        schemas that can be compiled, never builds a ``ValidationError``.
+
+        >>> checker = Checker()
+        >>> checker.is_valid(123, {'type': 'integer'})
+        True
+        >>> checker.is_valid(123, {'type': 'string'})
+        False
+
+        Raises:
+            UnknownType: If the schema refers to an undefined type.
+        """
+
+        return self.compile(schema).is_valid(value)
+
+    def compile(self, schema):
+        """
+        Returns a ``CompiledSchema`` for a JSON schema, which validates values
+        like ``check`` does.
+
+        Compiled schemas are cached, so compiling the same schema twice
+        returns the same object.
 
-        self._validator(schema).validate(value)
+        >>> checker = Checker()
+        >>> check_small = checker.compile({'type': 'integer', 'maximum': 10})
+        >>> check_small(5)
+        >>> check_small(50)
+        Traceback (most recent call last):
+            ...
+        ValidationError: 50 is greater than the maximum of 10
+        <BLANKLINE>
+        Failed validating 'maximum' in schema:
+            {'maximum': 10, 'type': 'integer'}
+        <BLANKLINE>
+        On instance:
+            50
+        >>> check_small is checker.compile({'type': 'integer', 'maximum': 10})
+        True
+        """
+
+        try:
+            key = fingerprint(schema)
+        except TypeError:
+            # Schemas with unhashable leaves can't be cached, so generating
+            # code for them isn't worth it.
+            return CompiledSchema(self, schema, generate=False)
+
+        compiled = self._cache.get(key)
+        if compiled is None:
+            # Keep our own copy so that later mutations of the caller's
+            # schema don't leak into the cached one.
+            compiled = CompiledSchema(self, copy.deepcopy(schema))
+            self._cache.put(key, compiled)
+        return compiled
+
+    def cache_info(self):
+        """
+        Returns the hits, misses, maximum and current size of the compiled
+        schema cache as a namedtuple.
+        """
+
+        return self._cache.info()
+
+    def clear_cache(self):
+        """
+        Drops every cached compiled schema.
+        """
+
+        self._cache.clear()
 
-    def define(self, name, definition):
+    def define(self, name, definition, memoize=None, coerce=None):
         """
         Define a custom type for this checker.
 
@@ -49,6 +191,14 @@ class Checker(object):
             name: An identifier for the type.
             definition: Either a JSON schema, a custom Python type (including
                 classes), or a function that takes a value and returns `bool`.
+                It can be ``None`` if ``coerce`` is given, and then the values
+                of the type are those that ``coerce`` accepts.
+            memoize: Only for functions, which must then be pure. Either
+                ``True`` or a ``Memoize`` policy, to remember the results of
+                the function for hashable, immutable values.
+            coerce: A function that takes a value of the type and returns it
+                converted to some Python value, raising any exception for
+                values not of the type. See ``coerce``.
 
         >>> checker = Checker()
         >>> checker.define('my_type', {'type': 'integer', 'minimum': 10})
@@ -84,8 +234,41 @@ class Checker(object):
         <BLANKLINE>
         On instance:
             3
+
+        Repeated checks of the same values can skip the function:
+
+        >>> checker.define('odd', lambda x: x % 2 == 1, memoize=True)
+        >>> for x in [1, 1, 1, 3]:
+        ...     checker.check(x, {'type': 'odd'})
+        >>> checker.memo_info('odd')
+        CacheInfo(hits=2, misses=2, maxsize=1024, currsize=2)
         """
 
+        if definition is None:
+            if coerce is None:
+                raise ValueError("a definition or coerce is needed")
+            definition = _Accepts(coerce)
+
+        if memoize:
+            if isinstance(definition, type) or not callable(definition):
+                raise ValueError("only functions can be memoized")
+            if memoize is True:
+                memoize = Memoize()
+            definition = MemoizedPredicate(
+                definition,
+                LRUCache(memoize.maxsize, memoize.ttl),
+            )
+
+        # Validators copy the type table when built, and generated code
+        # embeds the definitions.
+        self._definitions[unicode(name)] = definition
+        if coerce is not None:
+            self._coercions[unicode(name)] = coerce
+        else:
+            self._coercions.pop(unicode(name), None)
+        self._generation += 1
+        self.clear_cache()
+
         if isinstance(definition, type):
             self._validator.DEFAULT_TYPES[unicode(name)] = definition
             return
@@ -99,7 +282,7 @@ class Checker(object):
         # schema.
         # Sorry for the black magic.
 
-        check = self.check
+        is_valid = self.is_valid
 
         class DefinedTypeMeta(type):
             if callable(definition):
@@ -111,8 +294,7 @@ class Checker(object):
             else:
                 def __instancecheck__(self, value):
                     try:
-                        check(value, definition)
-                        return True
+                        return is_valid(value, definition)
                     except:
                         return False
 
@@ -121,12 +303,68 @@ class Checker(object):
 
         self._validator.DEFAULT_TYPES[unicode(name)] = DefinedType
 
-    def extend(self, types):
+    def coerce(self, value, name):
+        """
+        Checks that a value is of a type defined with ``coerce``, and returns
+        it converted, so that values that need parsing are parsed only once.
+
+        >>> checker = Checker()
+        >>> checker.define('decimal', None, coerce=lambda x: int(x, 10))
+        >>> checker.coerce('12', 'decimal')
+        12
+        >>> checker.check('0x12', {'type': 'decimal'})
+        Traceback (most recent call last):
+            ...
+        ValidationError: '0x12' is not of type 'decimal'
+        <BLANKLINE>
+        Failed validating 'type' in schema:
+            {'type': 'decimal'}
+        <BLANKLINE>
+        On instance:
+            '0x12'
+        >>> checker.coerce('0x12', 'decimal')
+        Traceback (most recent call last):
+            ...
+        ValidationError: '0x12' is not of type 'decimal'
+        <BLANKLINE>
+        Failed validating 'type' in schema:
+            {'type': 'decimal'}
+        <BLANKLINE>
+        On instance:
+            '0x12'
+        """
+
+        coerce = self._coercions.get(name)
+        if coerce is None:
+            raise ValueError("type %r can't be coerced" % (name,))
+        try:
+            return coerce(value)
+        except Exception:
+            pass
+        self.check(value, {'type': name})
+        # The definition and the coercion don't agree.
+        return coerce(value)
+
+    def memo_info(self, name):
+        """
+        Returns the hits, misses, maximum and current size of the cache of a
+        type defined with ``memoize``, as a namedtuple with a ``hit_rate``
+        property.
+        """
+
+        definition = self._definitions[unicode(name)]
+        if not isinstance(definition, MemoizedPredicate):
+            raise ValueError("type %r isn't memoized" % (name,))
+        return definition.cache.info()
+
+    def extend(self, types, coercions=None):
         """
         Defines several types at once.
 
         Args:
             types: A dictionary of type definitions indexed by name.
+            coercions: A dictionary of ``coerce`` functions for some of the
+                types, indexed by name.
 
         >>> class MyModule:
         ...     types = {'foo': {'type': 'integer', 'minimum': 10}}
@@ -145,13 +383,258 @@ class Checker(object):
             5
         """
 
+        coercions = coercions or {}
         for name, definition in types.iteritems():
-            self.define(name, definition)
+            self.define(name, definition, coerce=coercions.get(name))
 
     def frozen(self):
         return FrozenChecker.from_checker(self)
 
 
+class _Accepts(object):
+    """
+    A predicate telling whether a function returns for a value, instead of
+    raising an exception.
+    """
+
+    def __init__(self, function):
+        self.function = function
+
+    def __call__(self, value):
+        try:
+            self.function(value)
+        except Exception:
+            return False
+        return True
+
+
+# Converters registered by class, and the converter found for every class
+# seen so far, or None if it has none. The classes seen are forgotten once
+# there are too many, so that classes created on the fly don't pile up.
+_adapters = {}
+_adapters_by_class = {}
+_MAX_ADAPTED_CLASSES = 1024
+
+
+def register_adapter(cls, converter):
+    """
+    Registers a function that converts instances of a class, including its
+    subclasses, to the value that is actually checked against schemas.
+
+    Values with a ``to_validate`` method, either in their class or set on
+    the instance itself, are converted by calling it, unless their class
+    has a registered converter.
+
+    >>> class Point(object):
+    ...     def __init__(self, x, y):
+    ...         self.x, self.y = x, y
+    >>> register_adapter(Point, lambda p: [p.x, p.y])
+    >>> check(Point(1, 2), {'type': 'array', 'items': {'type': 'integer'}})
+    """
+
+    _adapters[cls] = converter
+    _adapters_by_class.clear()
+
+
+def _call_to_validate(value):
+    return value.to_validate()
+
+
+def _instance_to_validate(value):
+    to_validate = value.__dict__.get('to_validate')
+    if to_validate is None:
+        return value
+    return to_validate()
+
+
+def _find_adapter(cls):
+    mro = getattr(cls, '__mro__', None)
+    if mro is None:
+        # An old-style class. inspect is slow to import, so it's only
+        # imported for them.
+        import inspect
+        mro = inspect.getmro(cls)
+    for base in mro:
+        if base in _adapters:
+            return _adapters[base]
+    if hasattr(cls, 'to_validate'):
+        return _call_to_validate
+    # Instances may still have their own to_validate, if they have a
+    # __dict__. Instances of old-style classes always have one.
+    if getattr(cls, '__dictoffset__', 1):
+        return _instance_to_validate
+    return None
+
+
+def _to_validate(value):
+    cls = value.__class__
+    try:
+        converter = _adapters_by_class[cls]
+    except KeyError:
+        if len(_adapters_by_class) >= _MAX_ADAPTED_CLASSES:
+            _adapters_by_class.clear()
+        converter = _adapters_by_class[cls] = _find_adapter(cls)
+    if converter is None:
+        return value
+    return converter(value)
+
+
+class CompiledSchema(object):
+    """
+    A JSON schema bound to a ``Checker``, as returned by ``Checker.compile``.
+
+    Calling it with a value has the same effect as ``checker.check(value,
+    schema)``. Values are first tested by a Python function generated for the
+    schema, whose source is available in ``source``; the jsonschema validator
+    only runs to report why a value is not valid, or for schemas the
+    generator doesn't support, in which case ``source`` is ``None``.
+
+    >>> checker = Checker()
+    >>> compiled = checker.compile({'type': ['string', 'null']})
+    >>> compiled('foo')
+    >>> print compiled.source
+    def is_valid(v):
+        return (isinstance(v, _T0) or (v is None))
+    <BLANKLINE>
+    """
+
+    def __init__(self, checker, schema, generate=True):
+        self.checker = checker
+        self.schema = schema
+        self.source = None
+        self._generate = generate
+        self._generation = None
+
+    def __getstate__(self):
+        return {
+            'checker': self.checker,
+            'schema': self.schema,
+            'generate': self._generate,
+        }
+
+    def __setstate__(self, state):
+        self.__init__(state['checker'], state['schema'], state['generate'])
+
+    def __call__(self, value):
+        value = _to_validate(value)
+        if self._generation != self.checker._generation:
+            self._build()
+
+        # Same as _error, inlined since this is the hottest path.
+        try:
+            if self._predicate(value):
+                return
+        except Exception:
+            pass
+        error = next(self._validator.iter_errors(value), None)
+        if error is not None:
+            raise error
+
+    def is_valid(self, value):
+        """
+        Returns whether a value complies with the schema, without building
+        any ``ValidationError`` unless the schema couldn't be compiled.
+        """
+
+        value = _to_validate(value)
+        if self._generation != self.checker._generation:
+            self._build()
+
+        return self._test(value)
+
+    def check_many(self, values, mode=COLLECT_ALL):
+        """
+        Checks every value of an iterable against the schema.
+
+        Args:
+            values: An iterable of values.
+            mode: What to do with the invalid values:
+
+                * ``FAIL_FAST``: raise the ``ValidationError`` of the first
+                  one, with its index prepended to the error's ``path``.
+                * ``COLLECT_ALL``: return a list with either ``None`` or the
+                  ``ValidationError`` of each value.
+                * ``INVALID_INDICES``: return a list with their indices,
+                  without building any ``ValidationError``.
+
+        >>> checker = Checker()
+        >>> compiled = checker.compile({'type': 'integer'})
+        >>> compiled.check_many([1, 'a', 2, None], INVALID_INDICES)
+        [1, 3]
+        >>> [str(e).splitlines()[0] if e else e
+        ...  for e in compiled.check_many([1, 'a'], COLLECT_ALL)]
+        [None, "'a' is not of type 'integer'"]
+        >>> compiled.check_many([1, 'a', 2, None], FAIL_FAST)
+        Traceback (most recent call last):
+            ...
+        ValidationError: 'a' is not of type 'integer'
+        <BLANKLINE>
+        Failed validating 'type' in schema:
+            {'type': 'integer'}
+        <BLANKLINE>
+        On instance[1]:
+            'a'
+        """
+
+        if mode not in _CHECK_MANY_MODES:
+            raise ValueError('unknown mode: %r' % (mode,))
+
+        if self._generation != self.checker._generation:
+            self._build()
+        test = self._test
+
+        if mode == INVALID_INDICES:
+            return [
+                index for index, value in enumerate(values)
+                if not test(_to_validate(value))
+            ]
+
+        results = []
+        for index, value in enumerate(values):
+            value = _to_validate(value)
+            error = None if test(value) else self._error(value)
+            if error is not None and mode == FAIL_FAST:
+                error.path.appendleft(index)
+                raise error
+            results.append(error)
+
+        if mode == COLLECT_ALL:
+            return results
+
+    def _test(self, value):
+        try:
+            return self._predicate(value)
+        except Exception:
+            return self._validator.is_valid(value)
+
+    def _error(self, value):
+        if self._test(value):
+            return None
+        return next(self._validator.iter_errors(value), None)
+
+    def _build(self):
+        checker = self.checker
+        generation = checker._generation
+
+        self._validator = checker._validator(self.schema)
+        self._predicate = self._validator.is_valid
+        self.source = None
+        if self._generate:
+            try:
+                self.source, self._predicate = _compiler.generate(
+                    self.schema,
+                    self._validator,
+                    checker._definitions,
+                    checker.compile,
+                )
+            except Exception:
+                # Either unsupported, or malformed, in which case the
+                # validator will complain by itself.
+                pass
+
+        self._generation = generation
+
+
 class FrozenChecker(Checker):
     """
     A Checker that doesn't allow any further type definition.
@@ -159,12 +642,13 @@ class FrozenChecker(Checker):
 
     @staticmethod
     def from_checker(other):
-        frozen = FrozenChecker()
-        for type, definition in other._validator.DEFAULT_TYPES.items():
-            super(FrozenChecker, frozen).define(type, definition)
+        frozen = FrozenChecker(other._cache.maxsize)
+        for name, definition in other._definitions.items():
+            super(FrozenChecker, frozen).define(
+                name, definition, coerce=other._coercions.get(name))
         return frozen
 
-    def define(self, name, schema, check=None):
+    def define(self, name, schema, check=None, memoize=None, coerce=None):
         raise Exception("can't add types to a frozen checker.")
 
 checker = FrozenChecker()
@@ -177,6 +661,35 @@ def check(value, schema):
     checker.check(value, schema)
 
 
+def is_valid(value, schema):
+    """
+    Wrapper for a default Checker().is_valid(value, schema).
+    """
+    return checker.is_valid(value, schema)
+
+
+def check_many(values, schema, mode=COLLECT_ALL):
+    """
+    Wrapper for a default Checker().check_many(values, schema, mode).
+    """
+    return checker.check_many(values, schema, mode)
+
+
+def _compile_check(check_function, schema):
+    """
+    Returns a function that checks a value against a schema, compiling it if
+    check_function belongs to a Checker.
+    """
+
+    if check_function is check:
+        return checker.compile(schema)
+    owner = getattr(check_function, 'im_self', None)
+    if isinstance(owner, Checker) and \
+            check_function.im_func is Checker.check.im_func:
+        return owner.compile(schema)
+    return lambda value: check_function(value, schema)
+
+
 ValidationError = js.ValidationError
 SchemaError = js.SchemaError
 FormatError = js.FormatError